@@ -5,10 +5,18 @@ A Model Context Protocol server for interacting with PostgreSQL databases.
 """
 
 import os
+import re
+import sys
 import json
+import time
 import asyncio
+import logging
 import argparse
-from typing import Optional, Dict, Any, List
+import functools
+import itertools
+from operator import itemgetter
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, Tuple, Callable
 from contextlib import asynccontextmanager
 from pydantic import BaseModel, Field
 
@@ -16,19 +24,55 @@ import asyncpg
 from mcp.server.fastmcp import FastMCP
 from dotenv import load_dotenv
 
+# orjson is an optional speedup for result serialization
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Load environment variables
 load_dotenv()
 
+# Diagnostics go through logging to stderr: on the stdio transport, stdout
+# carries the MCP protocol and any stray write corrupts it
+logger = logging.getLogger("postgres_mcp")
+
+
+def get_pool_config() -> Dict[str, Any]:
+    """
+    Get connection pool settings from the environment.
+    
+    min_size connections are opened when the pool is created, so the
+    connection setup cost is paid at startup rather than on the first
+    concurrent burst of tool calls.
+    
+    Returns:
+        Dictionary with pool sizing and timeout settings
+    """
+    pool_min = int(os.getenv('PG_POOL_MIN', '5'))
+    return {
+        'pool_min': pool_min,
+        'pool_max': max(int(os.getenv('PG_POOL_MAX', '25')), pool_min),
+        'command_timeout': float(os.getenv('PG_COMMAND_TIMEOUT', '60')),
+        'connect_timeout': float(os.getenv('PG_POOL_CONNECT_TIMEOUT', '10'))
+    }
+
 
-def get_database_config() -> Dict[str, str]:
+@functools.lru_cache(maxsize=1)
+def get_database_config() -> Dict[str, Any]:
     """
     Get database configuration based on DB_PROFILE setting.
     Supports 'local' and 'external' profiles.
     
+    The environment is read once and the result memoized, so the profile
+    message is logged only on first use. Call get_database_config.cache_clear()
+    after changing the environment.
+    
     Returns:
-        Dictionary with database connection parameters
+        Dictionary with database connection and pool parameters
     """
     profile = os.getenv('DB_PROFILE', 'local').lower()
+    pool_config = get_pool_config()
     
     if profile == 'external':
         # Try external-specific environment variables first
@@ -43,7 +87,7 @@ def get_database_config() -> Dict[str, str]:
             db_url = f"postgresql://{user}:{password or ''}@{host}:{port}/{database}"
         
         if db_url:
-            print(f"Using external database profile: {host or 'from_url'}")
+            logger.info("Using external database profile: %s", host or 'from_url')
             return {
                 'profile': 'external',
                 'DATABASE_URL': db_url,
@@ -51,10 +95,11 @@ def get_database_config() -> Dict[str, str]:
                 'port': port,
                 'database': database,
                 'user': user,
-                'password': password
+                'password': password,
+                **pool_config
             }
         else:
-            print("Warning: External profile selected but configuration incomplete, falling back to legacy variables")
+            logger.warning("External profile selected but configuration incomplete, falling back to legacy variables")
     
     # Use local profile or fallback to legacy environment variables
     if profile == 'local':
@@ -69,7 +114,7 @@ def get_database_config() -> Dict[str, str]:
         if not db_url:
             db_url = f"postgresql://{user}:{password}@{host}:{port}/{database}"
         
-        print(f"Using local database profile: {host}:{port}/{database}")
+        logger.info("Using local database profile: %s:%s/%s", host, port, database)
         return {
             'profile': 'local',
             'DATABASE_URL': db_url,
@@ -77,7 +122,8 @@ def get_database_config() -> Dict[str, str]:
             'port': port,
             'database': database,
             'user': user,
-            'password': password
+            'password': password,
+            **pool_config
         }
     
     # Fallback to legacy environment variables
@@ -91,7 +137,7 @@ def get_database_config() -> Dict[str, str]:
     if not db_url:
         db_url = f"postgresql://{user}:{password}@{host}:{port}/{database}"
     
-    print(f"Using legacy database configuration: {host}:{port}/{database}")
+    logger.info("Using legacy database configuration: %s:%s/%s", host, port, database)
     return {
         'profile': 'legacy',
         'DATABASE_URL': db_url,
@@ -99,7 +145,8 @@ def get_database_config() -> Dict[str, str]:
         'port': port,
         'database': database,
         'user': user,
-        'password': password
+        'password': password,
+        **pool_config
     }
 
 
@@ -114,11 +161,12 @@ class TableListResult(BaseModel):
 class TableDataResult(BaseModel):
     """Result model for read_table tool."""
     table: str = Field(description="Full table name (schema.table)")
-    total_rows: int = Field(description="Total number of rows in table")
+    total_rows: int = Field(description="Total number of rows in table (planner estimate unless exact_count is set)")
     returned_rows: int = Field(description="Number of rows returned")
     limit: int = Field(description="Applied row limit")
     offset: int = Field(description="Applied row offset")
-    data: List[Dict[str, Any]] = Field(description="Table data rows")
+    columns: List[str] = Field(description="Column names, in the order of each row's values")
+    rows: List[List[Any]] = Field(description="Table data rows as arrays of column values")
 
 
 class ColumnInfo(BaseModel):
@@ -165,41 +213,316 @@ class SearchResult(BaseModel):
     matching_columns: List[Dict[str, str]] = Field(description="Columns matching the search")
 
 
-# Initialize FastMCP server
-mcp = FastMCP("postgresql-server")
+# Static metadata queries. Keeping the SQL text constant lets asyncpg's
+# per-connection statement cache reuse the server-side prepared statement,
+# so repeat calls skip parse/plan and go straight to bind/execute. The cache
+# is also shared with read_table's per-table page queries and ad-hoc
+# execute_query statements, so it is sized to keep the hot metadata
+# statements from being evicted by those.
+STATEMENT_CACHE_SIZE = 1024
+
+# Base tables in a schema
+_Q_LIST_TABLES = """
+    SELECT c.relname AS table_name
+    FROM pg_catalog.pg_class c
+    JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = $1
+    AND c.relkind IN ('r', 'p')
+    ORDER BY c.relname;
+"""
+
+# Pre-rendered describe_table column lines for a table oid, one row per
+# column in attnum order: "  • name: type NULL|NOT NULL [constraints]" plus
+# a Default line
+_Q_DESCRIBE_LINES = """
+    SELECT
+        '  • ' || a.attname || ': ' || format_type(a.atttypid, a.atttypmod)
+        || CASE WHEN a.attnotnull THEN ' NOT NULL' ELSE ' NULL' END
+        || COALESCE(' [' || (
+            SELECT string_agg(DISTINCT CASE con.contype
+                WHEN 'p' THEN 'PRIMARY KEY'
+                WHEN 'u' THEN 'UNIQUE'
+                WHEN 'f' THEN 'FOREIGN KEY'
+            END, ', ')
+            FROM pg_catalog.pg_constraint con
+            WHERE con.conrelid = a.attrelid
+            AND a.attnum = ANY(con.conkey)
+            AND con.contype IN ('p', 'u', 'f')
+        ) || ']', '')
+        || COALESCE(E'\\n      Default: ' || pg_get_expr(d.adbin, d.adrelid), '')
+        AS line
+    FROM pg_catalog.pg_attribute a
+    LEFT JOIN pg_catalog.pg_attrdef d
+        ON d.adrelid = a.attrelid AND d.adnum = a.attnum
+    WHERE a.attrelid = $1
+    AND a.attnum > 0 AND NOT a.attisdropped
+    ORDER BY a.attnum;
+"""
+
+# Index names and definitions for a table oid
+_Q_INDEXES = """
+    SELECT
+        ic.relname AS indexname,
+        pg_get_indexdef(i.indexrelid) AS indexdef
+    FROM pg_catalog.pg_index i
+    JOIN pg_catalog.pg_class ic ON ic.oid = i.indexrelid
+    WHERE i.indrelid = $1
+    ORDER BY ic.relname;
+"""
+
+# Foreign key column mappings for a table oid
+_Q_FKS = """
+    SELECT
+        a.attname AS column_name,
+        fc.relname AS foreign_table,
+        fa.attname AS foreign_column
+    FROM pg_catalog.pg_constraint con
+    CROSS JOIN LATERAL unnest(con.conkey, con.confkey) AS k(attnum, fattnum)
+    JOIN pg_catalog.pg_attribute a
+        ON a.attrelid = con.conrelid AND a.attnum = k.attnum
+    JOIN pg_catalog.pg_class fc ON fc.oid = con.confrelid
+    JOIN pg_catalog.pg_attribute fa
+        ON fa.attrelid = con.confrelid AND fa.attnum = k.fattnum
+    WHERE con.contype = 'f'
+        AND con.conrelid = $1
+    ORDER BY con.conname;
+"""
+
+# Resolve a quoted qualified name and return its planner row estimate;
+# returns no row when the relation does not exist. The estimate is -1 when
+# the table has never been vacuumed or analyzed: reltuples is -1 then on
+# PostgreSQL 14+, but 0 with relpages 0 on earlier versions
+_Q_RESOLVE_TABLE = """
+    SELECT CASE WHEN reltuples < 0 OR (reltuples = 0 AND relpages = 0)
+                THEN -1 ELSE reltuples END::bigint AS row_estimate
+    FROM pg_catalog.pg_class
+    WHERE oid = to_regclass($1)
+"""
+
+# Primary key columns of a table (by quoted qualified name), in key order.
+# A table without a primary key gives one row with a NULL attname, and an
+# unknown table gives no rows
+_Q_PRIMARY_KEY = """
+    SELECT a.attname
+    FROM (SELECT to_regclass($1) AS oid) t
+    LEFT JOIN pg_catalog.pg_index i
+        ON i.indrelid = t.oid AND i.indisprimary
+    LEFT JOIN pg_catalog.pg_attribute a
+        ON a.attrelid = i.indrelid AND a.attnum = ANY(i.indkey)
+    WHERE t.oid IS NOT NULL
+    ORDER BY array_position(i.indkey::int2[], a.attnum)
+"""
+
+# Resolve a table by schema and name to its oid, plus a cheap catalog
+# fingerprint of what describe_table shows. DDL on the table writes new rows
+# (and so new xmins) into its pg_class, pg_attribute, pg_index,
+# pg_constraint or pg_attrdef rows; the counts catch dropped columns,
+# indexes and constraints. Renames that only touch other objects are
+# covered too: the indexes' own pg_class rows (ALTER INDEX ... RENAME), the
+# column types' pg_type rows (ALTER TYPE ... RENAME), and the pg_class and
+# pg_attribute rows of the tables and columns its foreign keys reference.
+# Anything else, such as renaming a sequence named in a column default,
+# shows up only after invalidate_schema
+_Q_TABLE_FINGERPRINT = """
+    SELECT c.oid AS table_oid, concat_ws(':',
+        c.xmin::text,
+        (SELECT COUNT(*) || '/' || MAX(a.xmin::text::bigint) || '/' || MAX(t.xmin::text::bigint)
+         FROM pg_catalog.pg_attribute a
+         JOIN pg_catalog.pg_type t ON t.oid = a.atttypid
+         WHERE a.attrelid = c.oid),
+        (SELECT COUNT(*) || '/' || MAX(i.xmin::text::bigint) || '/' || MAX(ic.xmin::text::bigint)
+         FROM pg_catalog.pg_index i
+         JOIN pg_catalog.pg_class ic ON ic.oid = i.indexrelid
+         WHERE i.indrelid = c.oid),
+        (SELECT COUNT(*) || '/' || MAX(con.xmin::text::bigint)
+         FROM pg_catalog.pg_constraint con WHERE con.conrelid = c.oid),
+        (SELECT MAX(GREATEST(fc.xmin::text::bigint, fa.xmin::text::bigint))
+         FROM pg_catalog.pg_constraint con
+         JOIN pg_catalog.pg_class fc ON fc.oid = con.confrelid
+         JOIN pg_catalog.pg_attribute fa
+             ON fa.attrelid = con.confrelid AND fa.attnum = ANY(con.confkey)
+         WHERE con.conrelid = c.oid AND con.contype = 'f'),
+        (SELECT COUNT(*) || '/' || MAX(ad.xmin::text::bigint)
+         FROM pg_catalog.pg_attrdef ad WHERE ad.adrelid = c.oid)
+    ) AS fingerprint
+    FROM pg_catalog.pg_class c
+    JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = $1 AND c.relname = $2
+"""
+
+# Sizes, counts and column type distribution for get_table_stats in a
+# single statement, for a quoted qualified name. to_regclass resolves the
+# name once; no row comes back when the table does not exist, so this
+# doubles as the existence check. row_count is -1 for a table without a
+# usable estimate, as in _Q_RESOLVE_TABLE
+_Q_STATS = """
+    SELECT
+        pg_size_pretty(pg_total_relation_size(c.oid)) as total_size,
+        pg_size_pretty(pg_relation_size(c.oid)) as table_size,
+        pg_size_pretty(pg_indexes_size(c.oid)) as indexes_size,
+        CASE WHEN c.reltuples < 0 OR (c.reltuples = 0 AND c.relpages = 0)
+             THEN -1 ELSE c.reltuples END::bigint as row_count,
+        t.column_count,
+        t.type_names,
+        t.type_counts
+    FROM pg_catalog.pg_class c
+    CROSS JOIN LATERAL (
+        SELECT
+            COALESCE(SUM(d.count), 0)::bigint AS column_count,
+            array_agg(d.data_type ORDER BY d.count DESC, d.data_type) AS type_names,
+            array_agg(d.count ORDER BY d.count DESC, d.data_type) AS type_counts
+        FROM (
+            SELECT format_type(a.atttypid, NULL) AS data_type, COUNT(*) AS count
+            FROM pg_catalog.pg_attribute a
+            WHERE a.attrelid = c.oid
+            AND a.attnum > 0 AND NOT a.attisdropped
+            GROUP BY 1
+        ) d
+    ) t
+    WHERE c.oid = to_regclass($1)
+"""
+
+# Base tables whose name matches a LIKE pattern
+_Q_SEARCH_TABLES = """
+    SELECT c.relname AS table_name
+    FROM pg_catalog.pg_class c
+    JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = $1
+    AND LOWER(c.relname) LIKE $2
+    AND c.relkind IN ('r', 'p')
+    ORDER BY c.relname
+"""
+
+# Columns whose name (or table name) matches a LIKE pattern
+_Q_SEARCH_COLS = """
+    SELECT
+        c.relname AS table_name,
+        a.attname AS column_name,
+        format_type(a.atttypid, NULL) AS data_type
+    FROM pg_catalog.pg_attribute a
+    JOIN pg_catalog.pg_class c ON c.oid = a.attrelid
+    JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = $1
+    AND c.relkind IN ('r', 'p', 'v', 'm', 'f')
+    AND a.attnum > 0 AND NOT a.attisdropped
+    AND (LOWER(a.attname) LIKE $2 OR LOWER(c.relname) LIKE $2)
+    ORDER BY c.relname, a.attname
+"""
+
+
+# PostgreSQL truncates identifiers to NAMEDATALEN - 1 bytes
+MAX_IDENTIFIER_BYTES = 63
+
+
+def _quote_ident(name: str) -> str:
+    """
+    Quote an identifier the way PostgreSQL's quote_ident() does, unconditionally.
+    
+    Raises ValueError for names PostgreSQL cannot represent exactly: empty
+    names, names containing NUL, and names longer than 63 bytes, which the
+    server would silently truncate to a possibly different relation.
+    """
+    if not name or '\x00' in name or len(name.encode('utf-8')) > MAX_IDENTIFIER_BYTES:
+        raise ValueError(f"Invalid identifier: {name!r}")
+    return '"' + name.replace('"', '""') + '"'
+
 
-# Global connection pool
+def _qualified_name(schema: str, table_name: str) -> str:
+    """Build a safely quoted schema.table reference for interpolation into SQL."""
+    return f"{_quote_ident(schema)}.{_quote_ident(table_name)}"
+
+
+# Global connection pool, created once under _pool_lock
 pool: Optional[asyncpg.Pool] = None
+_pool_lock = asyncio.Lock()
+
+# After a failed pool build, further attempts are skipped for this many
+# seconds so an unreachable database fails tool calls fast instead of
+# stalling each one on the connect timeout
+POOL_INIT_BACKOFF = float(os.getenv('PG_INIT_BACKOFF_SEC', '5'))
+_pool_init_failed_at: Optional[float] = None
+
+# Rows fetched per round-trip when streaming results through a cursor
+CURSOR_PREFETCH = 1000
+
+
+async def _init_connection(conn: asyncpg.Connection) -> None:
+    """
+    Decode numeric and uuid columns straight to their text form.
+    
+    Results are serialized as JSON, where both end up as strings anyway;
+    decoding them as text skips building Decimal and UUID objects only to
+    str() them again for every value.
+    """
+    for type_name in ('numeric', 'uuid'):
+        await conn.set_type_codec(
+            type_name, schema='pg_catalog', encoder=str, decoder=str, format='text'
+        )
+
+
+async def _build_pool(db_config: Dict[str, Any]) -> asyncpg.Pool:
+    """Create the asyncpg pool with the configured sizing and timeouts."""
+    return await asyncpg.create_pool(
+        db_config['DATABASE_URL'],
+        min_size=db_config['pool_min'],
+        max_size=db_config['pool_max'],
+        max_inactive_connection_lifetime=300,
+        command_timeout=db_config['command_timeout'],
+        timeout=db_config['connect_timeout'],
+        statement_cache_size=STATEMENT_CACHE_SIZE,
+        init=_init_connection,
+        # Lets DBAs pick out this server's sessions in pg_stat_activity
+        server_settings={'application_name': 'postgres-mcp'}
+    )
+
+
+def _pool_init_backing_off() -> bool:
+    """Whether a recent failed pool build means we should not retry yet."""
+    return (
+        _pool_init_failed_at is not None
+        and time.monotonic() - _pool_init_failed_at < POOL_INIT_BACKOFF
+    )
 
 
 async def ensure_connection_pool() -> bool:
     """Ensure the global asyncpg pool is initialized.
 
+    Concurrent callers (the lifespan and early tool calls) are serialized so
+    only one pool is ever built. Within POOL_INIT_BACKOFF seconds of a
+    failed attempt, callers return False without trying again.
+
     Returns True if the pool is ready; False otherwise.
     """
-    global pool
+    global pool, _pool_init_failed_at
     if pool:
         return True
+    if _pool_init_backing_off():
+        return False
 
-    db_config = get_database_config()
-    db_url = db_config.get('DATABASE_URL')
+    async with _pool_lock:
+        # Another caller may have built the pool, or failed to, while we
+        # waited
+        if pool:
+            return True
+        if _pool_init_backing_off():
+            return False
 
-    if not db_url:
-        print("Error: No database URL could be constructed from configuration")
-        return False
+        db_config = get_database_config()
+        db_url = db_config.get('DATABASE_URL')
 
-    try:
-        pool = await asyncpg.create_pool(
-            db_url,
-            min_size=1,
-            max_size=10,
-            command_timeout=60
-        )
-        print("Connected to database successfully")
-        return True
-    except Exception as e:
-        print(f"Failed to connect to database: {e}")
-        return False
+        if not db_url:
+            logger.error("No database URL could be constructed from configuration")
+            return False
+
+        try:
+            pool = await _build_pool(db_config)
+            _pool_init_failed_at = None
+            logger.info("Connected to database successfully")
+            return True
+        except Exception as e:
+            _pool_init_failed_at = time.monotonic()
+            logger.error("Failed to connect to database: %s", e)
+            return False
 
 
 @asynccontextmanager
@@ -207,36 +530,136 @@ async def lifespan(server):
     """Manage database connection lifecycle."""
     global pool
     
-    # Startup: Create connection pool
-    db_config = get_database_config()
-    db_url = db_config.get('DATABASE_URL')
-    
-    if not db_url:
-        print("Error: No database URL could be constructed from configuration")
-        raise ValueError("Database configuration incomplete")
+    # Startup: build the pool before the first tool call. A failure here is
+    # not fatal; tools retry through ensure_connection_pool() on demand
+    await ensure_connection_pool()
     
     try:
-        pool = await asyncpg.create_pool(
-            db_url,
-            min_size=1,
-            max_size=10,
-            command_timeout=60
-        )
-        print(f"Connected to database successfully")
-    except Exception as e:
-        print(f"Failed to connect to database: {e}")
-        raise
-    
-    yield
-    
-    # Shutdown: Close connection pool
-    if pool:
-        await pool.close()
-        print("Database connection closed")
+        yield
+    finally:
+        # Shutdown: Close connection pool
+        if pool:
+            await pool.close()
+            pool = None
+            logger.info("Database connection closed")
+
+
+# Initialize FastMCP server; the lifespan must be passed at construction
+# time for FastMCP to run it. FastMCP also sets up logging to stderr at
+# the given level, which the module logger propagates to
+mcp = FastMCP(
+    "postgresql-server",
+    lifespan=lifespan,
+    log_level=os.getenv('LOG_LEVEL', 'INFO').upper()
+)
 
 
-# Set the lifespan for the FastMCP server
-mcp.lifespan = lifespan
+# Metadata cache: (helper name, schema, *args) -> (expires_at, value), least
+# recently used first. Keys include LLM-chosen table names and search terms,
+# so the cache is bounded. SCHEMA_CACHE_TTL=0 turns the cache off
+METADATA_CACHE_TTL = float(os.getenv('SCHEMA_CACHE_TTL', '30'))
+METADATA_CACHE_SIZE = 1024
+_META_CACHE: "OrderedDict[tuple, Tuple[float, Any]]" = OrderedDict()
+_META_LOCKS: Dict[tuple, asyncio.Lock] = {}
+
+
+# Rendered describe_table output that outlives the TTL cache:
+# (schema, table) -> (catalog fingerprint, rendered text), least recently
+# used first
+DESCRIBE_CACHE_SIZE = 512
+_DESCRIBE_CACHE: "OrderedDict[Tuple[str, str], Tuple[str, str]]" = OrderedDict()
+
+
+def cached(
+    ttl: float = METADATA_CACHE_TTL,
+    is_negative: Optional[Callable[[Any], bool]] = None
+):
+    """
+    Cache the result of an async metadata helper for ``ttl`` seconds.
+
+    Decorated helpers take the schema as their first positional argument so
+    that invalidate_schema() can find their entries. Concurrent calls with the
+    same arguments wait on a per-key lock and share a single database query.
+    Exceptions are never cached, and a ttl of zero or less disables caching.
+    Neither are results for which ``is_negative`` returns True (a missing
+    table, an empty search), so an object created after a miss shows up on
+    the next call.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args):
+            if ttl <= 0:
+                return await func(*args)
+            
+            key = (func.__name__, *args)
+            entry = _META_CACHE.get(key)
+            if entry and entry[0] > time.monotonic():
+                _META_CACHE.move_to_end(key)
+                return entry[1]
+
+            lock = _META_LOCKS.setdefault(key, asyncio.Lock())
+            async with lock:
+                # Another caller may have filled the entry while we waited
+                entry = _META_CACHE.get(key)
+                if entry and entry[0] > time.monotonic():
+                    return entry[1]
+
+                try:
+                    value = await func(*args)
+                finally:
+                    # A later caller may already have put a new lock here
+                    if _META_LOCKS.get(key) is lock:
+                        del _META_LOCKS[key]
+                if is_negative is not None and is_negative(value):
+                    return value
+                
+                now = time.monotonic()
+                _META_CACHE[key] = (now + ttl, value)
+                _META_CACHE.move_to_end(key)
+                
+                # Drop expired entries from the cold end, then anything over
+                # the size bound
+                while _META_CACHE:
+                    oldest_key, (expires_at, _) = next(iter(_META_CACHE.items()))
+                    if expires_at > now and len(_META_CACHE) <= METADATA_CACHE_SIZE:
+                        break
+                    del _META_CACHE[oldest_key]
+                return value
+
+        return wrapper
+    return decorator
+
+
+@cached(is_negative=lambda result: not result.tables)
+async def _fetch_table_list(schema: str) -> TableListResult:
+    """Fetch the base tables of a schema."""
+    rows = await pool.fetch(_Q_LIST_TABLES, schema)
+
+    tables = [row['table_name'] for row in rows]
+
+    return TableListResult(
+        schema_name=schema,
+        tables=tables,
+        total_count=len(tables)
+    )
+
+
+@cached(is_negative=lambda sort_key: sort_key is None)
+async def _fetch_sort_key(schema: str, table_name: str) -> Optional[str]:
+    """
+    Return the ORDER BY list read_table pages by, or None if there is no
+    such table.
+    
+    The primary key lets PostgreSQL walk its index and stop after the page
+    instead of sorting the whole table. Tables without one fall back to the
+    first column, which still gives stable pagination.
+    """
+    rows = await pool.fetch(_Q_PRIMARY_KEY, _qualified_name(schema, table_name))
+    if not rows:
+        return None
+    if rows[0]['attname'] is None:
+        return "1"
+    return ", ".join(_quote_ident(row['attname']) for row in rows)
 
 
 @mcp.tool()
@@ -260,24 +683,7 @@ async def list_tables(schema: str = "public") -> TableListResult:
             )
     
     try:
-        async with pool.acquire() as conn:
-            query = """
-                SELECT table_name 
-                FROM information_schema.tables 
-                WHERE table_schema = $1 
-                AND table_type = 'BASE TABLE'
-                ORDER BY table_name;
-            """
-            rows = await conn.fetch(query, schema)
-            
-            tables = [row['table_name'] for row in rows]
-            
-            return TableListResult(
-                schema_name=schema,
-                tables=tables,
-                total_count=len(tables)
-            )
-            
+        return await _fetch_table_list(schema)
     except Exception as e:
         # Return empty result on error
         return TableListResult(
@@ -287,21 +693,49 @@ async def list_tables(schema: str = "public") -> TableListResult:
         )
 
 
+@functools.lru_cache(maxsize=1024)
+def _read_table_sql(qualified: str, sort_key: str, exact_count: bool) -> str:
+    """
+    Build read_table's page query for a quoted table name.
+    
+    Identifiers are quoted by the caller so the names cannot inject SQL. An
+    exact total rides along as a window count, which needs a full scan and
+    so is only added on request. The text is memoized per table, so repeat
+    reads reuse both the string and asyncpg's cached prepared statement.
+    """
+    total_column = ", COUNT(*) OVER () AS __mcp_total_rows" if exact_count else ""
+    return f"""
+        SELECT *{total_column} FROM {qualified}
+        ORDER BY {sort_key}
+        LIMIT $1 OFFSET $2
+    """
+
+
+@functools.lru_cache(maxsize=1024)
+def _count_sql(qualified: str) -> str:
+    """Build an exact row count query for a quoted table name."""
+    return f"SELECT COUNT(*) FROM {qualified}"
+
+
 @mcp.tool()
 async def read_table(
     table_name: str,
     schema: str = "public",
     limit: int = 100,
-    offset: int = 0
+    offset: int = 0,
+    exact_count: bool = False
 ) -> TableDataResult:
     """
-    Read contents from a PostgreSQL table.
+    Read contents from a PostgreSQL table, ordered by its primary key (or by
+    its first column if it has none).
     
     Args:
         table_name: Name of the table to read
         schema: Database schema (default: "public")
         limit: Maximum number of rows to return (default: 100)
         offset: Number of rows to skip (default: 0)
+        exact_count: Count rows with COUNT(*) instead of using the planner
+            estimate (default: False)
     
     Returns:
         Structured table data with metadata
@@ -314,51 +748,68 @@ async def read_table(
                 returned_rows=0,
                 limit=limit,
                 offset=offset,
-                data=[]
+                columns=[],
+                rows=[]
             )
     
     try:
-        async with pool.acquire() as conn:
-            # Validate table exists
-            check_query = """
-                SELECT COUNT(*) 
-                FROM information_schema.tables 
-                WHERE table_schema = $1 AND table_name = $2
-            """
-            exists = await conn.fetchval(check_query, schema, table_name)
-            
-            if not exists:
-                return TableDataResult(
-                    table=f"{schema}.{table_name}",
-                    total_rows=0,
-                    returned_rows=0,
-                    limit=limit,
-                    offset=offset,
-                    data=[]
-                )
-            
-            # Get total row count
-            count_query = f"SELECT COUNT(*) FROM {schema}.{table_name}"
-            total_rows = await conn.fetchval(count_query)
-            
-            # Read table data with limit and offset
-            # Note: In production, you should use proper identifier escaping
-            data_query = f"""
-                SELECT * FROM {schema}.{table_name}
-                ORDER BY 1
-                LIMIT $1 OFFSET $2
-            """
-            rows = await conn.fetch(data_query, limit, offset)
-            
+        qualified = _qualified_name(schema, table_name)
+        
+        # An unknown table still gets a page query, which fails below
+        sort_key = await _fetch_sort_key(schema, table_name) or "1"
+        data_query = _read_table_sql(qualified, sort_key, exact_count)
+        
+        # Resolve the table (with its planner row estimate) and read the page
+        # concurrently on separate connections. to_regclass returns NULL
+        # rather than raising for unknown tables; the page query raises
+        # UndefinedTableError instead
+        try:
+            table, records = await asyncio.gather(
+                pool.fetchrow(_Q_RESOLVE_TABLE, qualified),
+                pool.fetch(data_query, limit, offset)
+            )
+        except asyncpg.UndefinedTableError:
+            table = None
+        
+        if table is None:
             return TableDataResult(
                 table=f"{schema}.{table_name}",
-                total_rows=total_rows,
-                returned_rows=len(rows),
+                total_rows=0,
+                returned_rows=0,
                 limit=limit,
                 offset=offset,
-                data=[dict(row) for row in rows]
+                columns=[],
+                rows=[]
             )
-            
+        
+        # Column names are sent once rather than repeated in every row
+        columns = list(records[0].keys()) if records else []
+        rows = [list(record) for record in records]
+        
+        # Use the planner estimate for the total unless an exact count was
+        # requested; a table that has never been vacuumed or analyzed has no
+        # estimate
+        total_rows = table['row_estimate']
+        if exact_count and rows:
+            total_rows = rows[0][-1]
+            columns.pop()
+            for row in rows:
+                row.pop()
+        elif exact_count or total_rows < 0:
+            total_rows = await pool.fetchval(_count_sql(qualified))
+        
+        # Every field is already of its declared type, and List[List[Any]]
+        # has nothing to check, so skip validation rather than copy each row
+        return TableDataResult.model_construct(
+            table=f"{schema}.{table_name}",
+            total_rows=total_rows,
+            returned_rows=len(rows),
+            limit=limit,
+            offset=offset,
+            columns=columns,
+            rows=rows
+        )
+        
     except Exception as e:
         return TableDataResult(
             table=f"{schema}.{table_name}",
@@ -366,10 +817,75 @@ async def read_table(
             returned_rows=0,
             limit=limit,
             offset=offset,
-            data=[]
+            columns=[],
+            rows=[]
         )
 
 
+@cached(is_negative=lambda text: text.endswith("' not found"))
+async def _render_table_description(schema: str, table_name: str) -> str:
+    """Render the describe_table report for a table."""
+    # Check the catalog fingerprint first; if the definition hasn't changed
+    # since we last rendered it, reuse that text and skip the heavy queries
+    key = (schema, table_name)
+    table = await pool.fetchrow(_Q_TABLE_FINGERPRINT, schema, table_name)
+    if table is None:
+        _DESCRIBE_CACHE.pop(key, None)
+        return f"Table '{schema}.{table_name}' not found"
+    
+    fingerprint = table['fingerprint']
+    entry = _DESCRIBE_CACHE.get(key)
+    if entry and entry[0] == fingerprint:
+        _DESCRIBE_CACHE.move_to_end(key)
+        return entry[1]
+    
+    rendered = await _describe_uncached(schema, table_name, table['table_oid'])
+    
+    _DESCRIBE_CACHE[key] = (fingerprint, rendered)
+    _DESCRIBE_CACHE.move_to_end(key)
+    if len(_DESCRIBE_CACHE) > DESCRIBE_CACHE_SIZE:
+        _DESCRIBE_CACHE.popitem(last=False)
+    
+    return rendered
+
+
+async def _describe_uncached(schema: str, table_name: str, table_oid: int) -> str:
+    """Query the catalog and format the describe_table report."""
+    # The table is already resolved, so each lookup filters directly on the
+    # indexed oid columns. They are independent and run concurrently on
+    # separate pooled connections
+    columns, indexes, foreign_keys = await asyncio.gather(
+        pool.fetch(_Q_DESCRIBE_LINES, table_oid),
+        pool.fetch(_Q_INDEXES, table_oid),
+        pool.fetch(_Q_FKS, table_oid)
+    )
+    
+    if not columns:
+        return f"Table '{schema}.{table_name}' not found"
+    
+    # Format the output; collect the pieces and join once at the end
+    parts = [f"=== Table: {schema}.{table_name} ===\n\n", "COLUMNS:\n"]
+    
+    # Column lines come pre-rendered from the query
+    for col in columns:
+        parts.append(col['line'])
+        parts.append("\n")
+    
+    # Add foreign keys section
+    if foreign_keys:
+        parts.append("\nFOREIGN KEYS:\n")
+        for fk in foreign_keys:
+            parts.append(f"  • {fk['column_name']} -> {fk['foreign_table']}.{fk['foreign_column']}\n")
+    
+    # Add indexes section
+    if indexes:
+        parts.append("\nINDEXES:\n")
+        for idx in indexes:
+            parts.append(f"  • {idx['indexname']}\n      {idx['indexdef']}\n")
+    
+    return "".join(parts)
+
+
 @mcp.tool()
 async def describe_table(table_name: str, schema: str = "public") -> str:
     """
@@ -386,119 +902,79 @@ async def describe_table(table_name: str, schema: str = "public") -> str:
         if not await ensure_connection_pool():
             return "Error: Database connection not initialized"
     
-    async with pool.acquire() as conn:
-        # Get column information
-        column_query = """
-            SELECT 
-                c.column_name,
-                c.data_type,
-                c.character_maximum_length,
-                c.numeric_precision,
-                c.numeric_scale,
-                c.is_nullable,
-                c.column_default,
-                ARRAY_AGG(tc.constraint_type) as constraints
-            FROM information_schema.columns c
-            LEFT JOIN information_schema.key_column_usage kcu
-                ON c.table_schema = kcu.table_schema
-                AND c.table_name = kcu.table_name
-                AND c.column_name = kcu.column_name
-            LEFT JOIN information_schema.table_constraints tc
-                ON kcu.constraint_name = tc.constraint_name
-                AND kcu.table_schema = tc.table_schema
-            WHERE c.table_schema = $1 AND c.table_name = $2
-            GROUP BY 
-                c.column_name, c.ordinal_position, c.data_type,
-                c.character_maximum_length, c.numeric_precision,
-                c.numeric_scale, c.is_nullable, c.column_default
-            ORDER BY c.ordinal_position;
-        """
-        
-        columns = await conn.fetch(column_query, schema, table_name)
-        
+    return await _render_table_description(schema, table_name)
+
+
+# Statements execute_query accepts: plain SELECTs and CTEs (WITH ... SELECT)
+_STARTS_SELECT_RE = re.compile(r'^\s*(?:select|with)\b', re.IGNORECASE)
+
+# A statement-ending semicolon, with only whitespace, -- comments and
+# /* */ comments after it
+_TRAILING_SEMICOLON_RE = re.compile(r';(?:\s*(?:--[^\n]*|/\*.*?\*/))*\s*$', re.DOTALL)
+
+def _validate_select(query: str) -> Optional[str]:
+    """
+    Check that a query is something execute_query may run.
+    
+    Only plain SELECTs and WITH queries are accepted. Writes are not searched
+    for by keyword: the query runs in a read-only transaction, so PostgreSQL
+    rejects any statement that would modify data, including data-modifying
+    CTEs, without false positives on names like "updated_at".
+    
+    Returns:
+        An error message, or None if the query may run
+    """
+    if not _STARTS_SELECT_RE.match(query):
+        return "Error: Only SELECT queries are allowed for safety. Use other tools for modifications."
+    return None
+
+
+def _dumps(obj: Any, indent: bool = False) -> str:
+    """
+    Serialize to JSON (optionally two-space indented), using orjson when it is installed.
+    
+    Both encoders write non-ASCII text as-is and pass datetimes through
+    str(). They still differ on floats: orjson writes NaN and Infinity as
+    null where json writes NaN and Infinity, and exponents are spelled
+    differently (1e16 vs 1e+16).
+    """
+    if orjson is not None:
+        option = orjson.OPT_PASSTHROUGH_DATETIME
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option, default=str).decode()
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False, default=str)
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False, default=str)
+
+
+async def _collect_cursor(cursor, max_rows: int) -> Tuple[List[str], List[tuple]]:
+    """
+    Read up to max_rows rows from a cursor, keeping each as a plain tuple.
+    
+    Stops as soon as the cap is reached, so the server never has to produce
+    more rows than are returned. Returns the column names and the rows;
+    serialization is left to the caller so it can happen after the
+    connection is released.
+    """
+    columns: List[str] = []
+    rows: List[tuple] = []
+    if max_rows <= 0:
+        return columns, rows
+    async for row in cursor:
         if not columns:
-            return f"Table '{schema}.{table_name}' not found"
-        
-        # Get indexes
-        index_query = """
-            SELECT 
-                indexname,
-                indexdef
-            FROM pg_indexes
-            WHERE schemaname = $1 AND tablename = $2;
-        """
-        indexes = await conn.fetch(index_query, schema, table_name)
-        
-        # Get foreign key relationships
-        fk_query = """
-            SELECT
-                kcu.column_name,
-                ccu.table_name AS foreign_table,
-                ccu.column_name AS foreign_column
-            FROM information_schema.table_constraints AS tc
-            JOIN information_schema.key_column_usage AS kcu
-                ON tc.constraint_name = kcu.constraint_name
-                AND tc.table_schema = kcu.table_schema
-            JOIN information_schema.constraint_column_usage AS ccu
-                ON ccu.constraint_name = tc.constraint_name
-                AND ccu.table_schema = tc.table_schema
-            WHERE tc.constraint_type = 'FOREIGN KEY' 
-                AND tc.table_schema = $1
-                AND tc.table_name = $2;
-        """
-        foreign_keys = await conn.fetch(fk_query, schema, table_name)
-        
-        # Format the output
-        result = f"=== Table: {schema}.{table_name} ===\n\n"
-        result += "COLUMNS:\n"
-        
-        for col in columns:
-            # Format data type
-            data_type = col['data_type']
-            if col['character_maximum_length']:
-                data_type += f"({col['character_maximum_length']})"
-            elif col['numeric_precision']:
-                data_type += f"({col['numeric_precision']}"
-                if col['numeric_scale']:
-                    data_type += f",{col['numeric_scale']}"
-                data_type += ")"
-            
-            # Format column line
-            nullable = "NULL" if col['is_nullable'] == 'YES' else "NOT NULL"
-            result += f"  • {col['column_name']}: {data_type} {nullable}"
-            
-            # Add constraints
-            constraints = [c for c in col['constraints'] if c]
-            if constraints:
-                result += f" [{', '.join(set(constraints))}]"
-            
-            # Add default value
-            if col['column_default']:
-                result += f"\n      Default: {col['column_default']}"
-            
-            result += "\n"
-        
-        # Add foreign keys section
-        if foreign_keys:
-            result += "\nFOREIGN KEYS:\n"
-            for fk in foreign_keys:
-                result += f"  • {fk['column_name']} -> {fk['foreign_table']}.{fk['foreign_column']}\n"
-        
-        # Add indexes section
-        if indexes:
-            result += "\nINDEXES:\n"
-            for idx in indexes:
-                result += f"  • {idx['indexname']}\n"
-                result += f"      {idx['indexdef']}\n"
-        
-        return result
+            columns = list(row.keys())
+        rows.append(tuple(row))
+        if len(rows) >= max_rows:
+            break
+    return columns, rows
 
 
 @mcp.tool()
 async def execute_query(query: str, limit: int = 100) -> str:
     """
     Execute a custom SELECT query on the PostgreSQL database.
-    For safety, only SELECT statements are allowed.
+    For safety, only SELECT statements (including WITH queries) are allowed.
     
     Args:
         query: SQL SELECT query to execute
@@ -507,57 +983,99 @@ async def execute_query(query: str, limit: int = 100) -> str:
     Returns:
         Query results in JSON format or error message
     """
+    # Safety check - only allow SELECT queries
+    error = _validate_select(query)
+    if error:
+        return error
+    
     if not pool:
         if not await ensure_connection_pool():
             return "Error: Database connection not initialized"
     
-    # Safety check - only allow SELECT queries
-    query_lower = query.lower().strip()
-    if not query_lower.startswith('select'):
-        return "Error: Only SELECT queries are allowed for safety. Use other tools for modifications."
+    # Wrap the query in an outer LIMIT so the planner knows only `limit`
+    # rows are wanted, whatever LIMIT the query itself carries. The cap is a
+    # bind parameter, so the wrapped text (and its prepared statement) is the
+    # same for any limit. The statement's closing semicolon, and any
+    # comments after it, can't go inside the subquery and are dropped; the
+    # newline keeps a trailing -- comment without a semicolon from
+    # swallowing the closing parenthesis
+    body = _TRAILING_SEMICOLON_RE.sub('', query.rstrip())
+    capped_query = f"SELECT * FROM (\n{body}\n) AS _mcp_query LIMIT $1"
     
-    # Check for dangerous keywords even in SELECT
-    dangerous_keywords = ['drop', 'delete', 'truncate', 'update', 'insert', 'alter', 'create']
-    for keyword in dangerous_keywords:
-        if keyword in query_lower:
-            return f"Error: Query contains potentially dangerous keyword '{keyword}'. Only pure SELECT queries are allowed."
+    try:
+        async with pool.acquire() as conn:
+            # Run inside a read-only transaction so PostgreSQL itself rejects
+            # any statement that would modify data
+            async with conn.transaction(readonly=True, isolation='repeatable_read'):
+                # Stream rows through a server-side cursor, stopping at the cap
+                cursor = conn.cursor(
+                    capped_query, max(limit, 0),
+                    prefetch=max(1, min(limit, CURSOR_PREFETCH))
+                )
+                columns, rows = await asyncio.wait_for(
+                    _collect_cursor(cursor, limit),
+                    timeout=30.0  # 30 second timeout
+                )
+    except asyncio.TimeoutError:
+        return "Error: Query execution timed out (30 seconds limit)"
+    except asyncpg.ReadOnlySQLTransactionError:
+        return "Error: Query attempted to modify data. Only read-only SELECT queries are allowed."
+    except asyncpg.PostgresSyntaxError as e:
+        return f"SQL Syntax Error: {str(e)}"
+    except asyncpg.InsufficientPrivilegeError:
+        return "Error: Insufficient privileges to execute this query"
+    except Exception as e:
+        return f"Query execution error: {str(e)}"
     
-    # Add LIMIT if not present
-    if 'limit' not in query_lower:
-        query = query.rstrip(';') + f" LIMIT {limit}"
+    # The connection is back in the pool; serialize without holding it
+    if not rows:
+        return "Query executed successfully but returned no results."
     
-    async with pool.acquire() as conn:
-        try:
-            # Execute query with timeout
-            rows = await asyncio.wait_for(
-                conn.fetch(query),
-                timeout=30.0  # 30 second timeout
-            )
-            
-            if not rows:
-                return "Query executed successfully but returned no results."
-            
-            # Get column names from the first row
-            columns = list(rows[0].keys())
-            
-            # Format results
-            result = {
-                "query": query[:200] + "..." if len(query) > 200 else query,
-                "columns": columns,
-                "row_count": len(rows),
-                "data": [dict(row) for row in rows]
-            }
-            
-            return json.dumps(result, indent=2, default=str)
-            
-        except asyncio.TimeoutError:
-            return "Error: Query execution timed out (30 seconds limit)"
-        except asyncpg.PostgresSyntaxError as e:
-            return f"SQL Syntax Error: {str(e)}"
-        except asyncpg.InsufficientPrivilegeError:
-            return "Error: Insufficient privileges to execute this query"
-        except Exception as e:
-            return f"Query execution error: {str(e)}"
+    # Format results in columnar form: column names once, then one array of
+    # values per row. The header is encoded on its own and each row is
+    # encoded compactly and spliced in as the "rows" array
+    result = {
+        "query": query[:200] + "..." if len(query) > 200 else query,
+        "columns": columns,
+        "row_count": len(rows)
+    }
+    header = _dumps(result, indent=True)
+    
+    return header[:-2] + ',\n  "rows": [\n    ' + ',\n    '.join(map(_dumps, rows)) + '\n  ]\n}'
+
+
+@cached(is_negative=lambda text: text.endswith("' not found"))
+async def _render_table_stats(schema: str, table_name: str) -> str:
+    """Render the get_table_stats report for a table."""
+    qualified = _qualified_name(schema, table_name)
+    stats = await pool.fetchrow(_Q_STATS, qualified)
+    
+    if stats is None:
+        return f"Error: Table '{schema}.{table_name}' not found"
+    
+    # row_count is the planner estimate; fall back to an exact count for
+    # tables that have never been vacuumed or analyzed
+    row_count = stats['row_count']
+    if row_count < 0:
+        row_count = await pool.fetchval(_count_sql(qualified))
+        row_label = f"{row_count:,}"
+    else:
+        row_label = f"~{row_count:,} (estimated)"
+    
+    # Format results
+    parts = [
+        f"=== Statistics for {schema}.{table_name} ===\n\n",
+        f"Row Count:     {row_label}\n",
+        f"Column Count:  {stats['column_count']}\n",
+        f"Total Size:    {stats['total_size']}\n",
+        f"Table Size:    {stats['table_size']}\n",
+        f"Indexes Size:  {stats['indexes_size']}\n\n",
+        "Column Type Distribution:\n"
+    ]
+    for data_type, count in zip(stats['type_names'] or [], stats['type_counts'] or []):
+        parts.append(f"  • {data_type}: {count} columns\n")
+    
+    return "".join(parts)
 
 
 @mcp.tool()
@@ -576,59 +1094,43 @@ async def get_table_stats(table_name: str, schema: str = "public") -> str:
         if not await ensure_connection_pool():
             return "Error: Database connection not initialized"
     
-    async with pool.acquire() as conn:
-        try:
-            # Check if table exists
-            exists_query = """
-                SELECT COUNT(*) 
-                FROM information_schema.tables 
-                WHERE table_schema = $1 AND table_name = $2
-            """
-            exists = await conn.fetchval(exists_query, schema, table_name)
-            
-            if not exists:
-                return f"Error: Table '{schema}.{table_name}' not found"
-            
-            # Get table size and stats
-            stats_query = """
-                SELECT 
-                    pg_size_pretty(pg_total_relation_size($1::regclass)) as total_size,
-                    pg_size_pretty(pg_relation_size($1::regclass)) as table_size,
-                    pg_size_pretty(pg_indexes_size($1::regclass)) as indexes_size,
-                    (SELECT COUNT(*) FROM """ + f"{schema}.{table_name}" + """) as row_count,
-                    (SELECT COUNT(*) FROM information_schema.columns 
-                     WHERE table_schema = $2 AND table_name = $3) as column_count
-            """
-            
-            full_table_name = f"{schema}.{table_name}"
-            stats = await conn.fetchrow(stats_query, full_table_name, schema, table_name)
-            
-            # Get column data types distribution
-            type_query = """
-                SELECT data_type, COUNT(*) as count
-                FROM information_schema.columns
-                WHERE table_schema = $1 AND table_name = $2
-                GROUP BY data_type
-                ORDER BY count DESC
-            """
-            type_dist = await conn.fetch(type_query, schema, table_name)
-            
-            # Format results
-            result = f"=== Statistics for {schema}.{table_name} ===\n\n"
-            result += f"Row Count:     {stats['row_count']:,}\n"
-            result += f"Column Count:  {stats['column_count']}\n"
-            result += f"Total Size:    {stats['total_size']}\n"
-            result += f"Table Size:    {stats['table_size']}\n"
-            result += f"Indexes Size:  {stats['indexes_size']}\n\n"
-            
-            result += "Column Type Distribution:\n"
-            for type_info in type_dist:
-                result += f"  • {type_info['data_type']}: {type_info['count']} columns\n"
-            
-            return result
-            
-        except Exception as e:
-            return f"Error getting table statistics: {str(e)}"
+    try:
+        return await _render_table_stats(schema, table_name)
+    except Exception as e:
+        return f"Error getting table statistics: {str(e)}"
+
+
+@cached(is_negative=lambda text: text.endswith("No matching tables found.\n\nNo matching columns found."))
+async def _render_search_results(schema: str, search_term: str) -> str:
+    """Render the search_tables report for a search term."""
+    search_pattern = f"%{search_term.lower()}%"
+    
+    matching_tables, matching_columns = await asyncio.gather(
+        pool.fetch(_Q_SEARCH_TABLES, schema, search_pattern),
+        pool.fetch(_Q_SEARCH_COLS, schema, search_pattern)
+    )
+    
+    # Format results
+    parts = [f"=== Search Results for '{search_term}' in schema '{schema}' ===\n\n"]
+    
+    if matching_tables:
+        parts.append(f"MATCHING TABLES ({len(matching_tables)}):\n")
+        for table in matching_tables:
+            parts.append(f"  • {table['table_name']}\n")
+        parts.append("\n")
+    else:
+        parts.append("No matching tables found.\n\n")
+    
+    if matching_columns:
+        parts.append(f"MATCHING COLUMNS ({len(matching_columns)}):\n")
+        # Rows arrive ordered by table, so each group is one table's columns
+        for table_name, cols in itertools.groupby(matching_columns, key=itemgetter('table_name')):
+            parts.append(f"\n  {table_name}:\n")
+            parts.extend(f"    • {col['column_name']} ({col['data_type']})\n" for col in cols)
+    else:
+        parts.append("No matching columns found.")
+    
+    return "".join(parts)
 
 
 @mcp.tool()
@@ -647,63 +1149,35 @@ async def search_tables(search_term: str, schema: str = "public") -> str:
         if not await ensure_connection_pool():
             return "Error: Database connection not initialized"
     
-    search_pattern = f"%{search_term.lower()}%"
+    return await _render_search_results(schema, search_term)
+
+
+@mcp.tool()
+async def invalidate_schema(schema: str = "public") -> str:
+    """
+    Clear cached metadata for a schema so the next tool call re-reads the catalog.
+    Use this after DDL changes when fresh table or column information is needed.
     
-    async with pool.acquire() as conn:
-        # Search for matching tables
-        table_query = """
-            SELECT table_name
-            FROM information_schema.tables
-            WHERE table_schema = $1
-            AND LOWER(table_name) LIKE $2
-            AND table_type = 'BASE TABLE'
-            ORDER BY table_name
-        """
-        matching_tables = await conn.fetch(table_query, schema, search_pattern)
-        
-        # Search for matching columns
-        column_query = """
-            SELECT 
-                table_name,
-                column_name,
-                data_type
-            FROM information_schema.columns
-            WHERE table_schema = $1
-            AND (LOWER(column_name) LIKE $2 OR LOWER(table_name) LIKE $2)
-            ORDER BY table_name, column_name
-        """
-        matching_columns = await conn.fetch(column_query, schema, search_pattern)
-        
-        # Format results
-        result = f"=== Search Results for '{search_term}' in schema '{schema}' ===\n\n"
-        
-        if matching_tables:
-            result += f"MATCHING TABLES ({len(matching_tables)}):\n"
-            for table in matching_tables:
-                result += f"  • {table['table_name']}\n"
-            result += "\n"
-        else:
-            result += "No matching tables found.\n\n"
-        
-        if matching_columns:
-            result += f"MATCHING COLUMNS ({len(matching_columns)}):\n"
-            current_table = None
-            for col in matching_columns:
-                if col['table_name'] != current_table:
-                    current_table = col['table_name']
-                    result += f"\n  {current_table}:\n"
-                result += f"    • {col['column_name']} ({col['data_type']})\n"
-        else:
-            result += "No matching columns found."
-        
-        return result
+    Args:
+        schema: Database schema to invalidate (default: "public")
+    
+    Returns:
+        A message with the number of cache entries removed
+    """
+    stale = [key for key in _META_CACHE if key[1] == schema]
+    for key in stale:
+        del _META_CACHE[key]
+    
+    stale_descriptions = [key for key in _DESCRIBE_CACHE if key[0] == schema]
+    for key in stale_descriptions:
+        del _DESCRIBE_CACHE[key]
+    
+    return f"Cleared {len(stale) + len(stale_descriptions)} cached entries for schema '{schema}'"
 
 
 # Main entry point
 def main():
     """Run the PostgreSQL MCP server."""
-    import sys
-    
     parser = argparse.ArgumentParser(description='PostgreSQL MCP Server')
     parser.add_argument(
         '--profile', 
@@ -721,6 +1195,7 @@ def main():
     # Override DB_PROFILE if specified via command line
     if args.profile:
         os.environ['DB_PROFILE'] = args.profile
+        get_database_config.cache_clear()
     
     # Validate database configuration
     try:
@@ -733,21 +1208,31 @@ def main():
         print(f"Error: Database configuration error: {e}", file=sys.stderr)
         sys.exit(1)
     
-    # Print configuration info
+    # Print configuration info; only --info may use stdout, since the
+    # server itself speaks MCP over it
+    out = sys.stdout if args.info else sys.stderr
     profile = os.getenv('DB_PROFILE', 'local')
-    print(f"Starting PostgreSQL MCP Server")
-    print(f"Database profile: {profile} ({db_config.get('profile', 'unknown')})")
-    print(f"Host: {db_config['host']}:{db_config['port']}")
-    print(f"Database: {db_config['database']}")
-    print(f"Transport: stdio (MCP protocol)")
+    print(f"Starting PostgreSQL MCP Server", file=out)
+    print(f"Database profile: {profile} ({db_config.get('profile', 'unknown')})", file=out)
+    print(f"Host: {db_config['host']}:{db_config['port']}", file=out)
+    print(f"Database: {db_config['database']}", file=out)
+    print(f"Transport: stdio (MCP protocol)", file=out)
     
     if args.info:
         print("\nConfiguration Details:")
         print(f"  DATABASE_URL: {db_config['DATABASE_URL'][:50]}...")
         print(f"  Profile: {db_config.get('profile', 'unknown')}")
+        print(f"  Pool size: {db_config['pool_min']}-{db_config['pool_max']} connections")
         return
     
-    print("\nServer ready for MCP connections...")
+    print("\nServer ready for MCP connections...", file=out)
+    
+    # Use uvloop's faster event loop for the server when it is installed
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
     
     # Run the FastMCP server (always uses stdio for MCP protocol)
     mcp.run()
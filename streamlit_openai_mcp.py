@@ -6,17 +6,39 @@ Uses GPT-4o to intelligently interact with your database through MCP.
 
 import streamlit as st
 import asyncio
+import atexit
+import io
 import json
 import os
+import re
 import sys
-from typing import Dict, Any, List
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Callable, Dict, Any, List, Optional
+import httpx
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
 from datetime import datetime
 from openai import OpenAI, AzureOpenAI
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 from dotenv import load_dotenv
 
+# orjson is an optional speedup for decoding tool results
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# tiktoken is optional too: with it, chat history is measured in tokens
+# rather than estimated from its length
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
 # Load environment variables
 load_dotenv()
 
@@ -27,8 +49,24 @@ st.set_page_config(
     layout="wide"
 )
 
+# Fail fast when the API can't be reached, but give a streamed reply time
+# between chunks
+OPENAI_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+OPENAI_MAX_RETRIES = 2
+
+
+@st.cache_resource
 def create_openai_client():
-    """Create OpenAI client based on AI_PROVIDER configuration."""
+    """
+    Create OpenAI client based on AI_PROVIDER configuration.
+    
+    Cached for the life of the app, so every rerun and session shares one
+    client and its HTTP connection pool.
+    
+    Raises:
+        ValueError: If the provider's credentials are missing. Exceptions are
+            not cached, so the next call tries again with the current config
+    """
     provider = os.getenv("AI_PROVIDER", "openai").lower()
     
     if provider == "azure":
@@ -38,13 +76,14 @@ def create_openai_client():
         azure_api_version = os.getenv("AZURE_OPENAI_API_VERSION", "2024-10-21")
         
         if not azure_endpoint or not azure_api_key:
-            st.error("❌ Azure OpenAI configuration incomplete. Please check AZURE_OPENAI_ENDPOINT and AZURE_OPENAI_API_KEY")
-            return None
+            raise ValueError("Azure OpenAI configuration incomplete. Please check AZURE_OPENAI_ENDPOINT and AZURE_OPENAI_API_KEY")
             
         return AzureOpenAI(
             api_key=azure_api_key,
             api_version=azure_api_version,
-            azure_endpoint=azure_endpoint
+            azure_endpoint=azure_endpoint,
+            timeout=OPENAI_TIMEOUT,
+            max_retries=OPENAI_MAX_RETRIES
         )
     else:
         # Standard OpenAI configuration
@@ -52,12 +91,13 @@ def create_openai_client():
         openai_base_url = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
         
         if not openai_api_key:
-            st.error("❌ OpenAI API key not found. Please set OPENAI_API_KEY")
-            return None
+            raise ValueError("OpenAI API key not found. Please set OPENAI_API_KEY")
             
         return OpenAI(
             api_key=openai_api_key,
-            base_url=openai_base_url
+            base_url=openai_base_url,
+            timeout=OPENAI_TIMEOUT,
+            max_retries=OPENAI_MAX_RETRIES
         )
 
 def get_model_name():
@@ -72,121 +112,605 @@ def get_model_name():
         return os.getenv("OPENAI_MODEL", "gpt-4o")
 
 # Initialize OpenAI client
-openai_client = create_openai_client()
-
-# System prompt for GPT-4o
-SYSTEM_PROMPT = """You are a helpful database assistant that helps users query a PostgreSQL database.
-You have access to the following MCP tools:
-
-1. list_tables(schema="public") - Lists all tables in the database
-2. describe_table(table_name, schema="public") - Shows the schema/structure of a table  
-3. read_table(table_name, schema="public", limit=100, offset=0) - Reads actual data from a table
-4. search_tables(search_term, schema="public") - Searches for tables/columns by name (metadata only)
-5. get_table_stats(table_name, schema="public") - Gets statistics about a table
-6. execute_query(query, limit=100) - Executes a SELECT SQL query
-
-**Tool Selection Guidelines:**
-- When user asks "what tables..." or "list tables" → use list_tables()
-- When user asks "show me records/data from [table]" or "all records for [table]" → use read_table(table_name="[table]")  
-- When user asks "structure/schema/columns of [table]" → use describe_table(table_name="[table]")
-- When user asks "find tables containing [term]" → use search_tables(search_term="[term]")
-- When user asks "statistics/size/count for [table]" → use get_table_stats(table_name="[table]")
-- For complex SQL queries → use execute_query(query="SELECT ...")
-
-**Response Formatting:**
-- Always provide natural language explanations, not raw JSON
-- When showing table lists, format as: "Your database contains X tables: table1, table2, table3..."
-- When showing data, explain what you're showing: "Here are the records from the [table] table:"
-- Use friendly, conversational language
-
-Based on the user's request, determine which tool(s) to call and with what parameters.
-Respond with a JSON object containing:
-{
-    "thoughts": "Your reasoning about what the user wants and which tool to use",
-    "tools_to_call": [
-        {
-            "tool": "tool_name",
-            "arguments": {
-                "param1": "value1",
-                "param2": "value2"
-            }
-        }
-    ],
-    "response_type": "text|dataframe|mixed", 
-    "user_facing_message": "Natural language explanation of what you're about to show them"
-}
+try:
+    openai_client = create_openai_client()
+except ValueError as e:
+    openai_client = None
+    st.error(f"❌ {e}")
+
+# System prompt for GPT-4o. It is sent with every request, so it is kept
+# terse: one line per tool and trigger, and a compact response spec
+SYSTEM_PROMPT = """You are a friendly assistant that answers questions about a PostgreSQL database by planning MCP tool calls.
 
-Important:
-- Only suggest SELECT queries for execute_query, never UPDATE/DELETE/DROP
-- Default to "public" schema unless specified
-- Always explain what you're doing in friendly language
-- If the user's request is unclear, ask for clarification
+Tools (schema defaults to "public"):
+- list_tables(schema) - tables in the database. Use for "what tables", "list tables"
+- describe_table(table_name, schema) - columns, constraints, indexes. Use for "structure/schema/columns of X"
+- read_table(table_name, schema, limit=100, offset=0) - table rows. Use for "show records/data from X"
+- search_tables(search_term, schema) - tables/columns whose name matches (metadata only). Use for "find tables containing X"
+- get_table_stats(table_name, schema) - row count, sizes, column types. Use for "statistics/size/count for X"
+- execute_query(query, limit=100) - a SELECT statement. Use for anything needing custom SQL
+
+Reply with a JSON object:
+{"thoughts": str, "tools_to_call": [{"tool": str, "arguments": {...}}], "response_type": "text"|"dataframe"|"mixed", "user_facing_message": str}
+user_facing_message explains in plain conversational language what is being shown (e.g. "Here are the records from the X table:"), never raw JSON.
+
+Rules:
+- execute_query only ever gets SELECT queries, never UPDATE/DELETE/DROP
 - Table and column names are case-sensitive
+- If the request is unclear, call no tools and ask for clarification
+- Earlier turns, if any, are in a [HISTORY] block; answer the request in the [QUERY] block
 """
 
+# Sent first, unchanged, in every request
+_SYSTEM_MESSAGE = {"role": "system", "content": SYSTEM_PROMPT}
+
+
+# Requests whose intent is unambiguous are routed without asking the model.
+# Each pattern must match the whole message, so anything with extra
+# conditions or detail still goes to GPT
+_LIST_TABLES_RE = re.compile(
+    r"^\s*(?:what|which|list|show)(?:\s+me)?\s+(?:all\s+)?(?:the\s+)?tables"
+    r"(?:\s+(?:do\s+i\s+have|are\s+there|exist))?(?:\s+in\s+(?:the|my)\s+database)?\s*[?.!]*\s*$",
+    re.IGNORECASE
+)
+_DESCRIBE_TABLE_RE = re.compile(
+    r"^\s*(?:describe|(?:show\s+(?:me\s+)?)?(?:the\s+)?(?:structure|schema|columns)\s+of)"
+    r"\s+(?:the\s+)?(?P<table>\w+)(?:\s+table)?\s*[?.!]*\s*$",
+    re.IGNORECASE
+)
+
+# Words that stand in for a table named earlier in the chat ("describe it",
+# "describe that table"). Only the model can resolve them from the history
+_ROUTE_STOP_WORDS = frozenset({
+    "it", "its", "that", "this", "these", "those", "them", "they", "their",
+    "same", "table", "tables",
+})
+
+
+def _routed_table(match: re.Match) -> Optional[str]:
+    """Return the table named by a routing match, or None if it is a reference."""
+    table_name = match.group("table")
+    if table_name.lower() in _ROUTE_STOP_WORDS:
+        return None
+    return table_name
+
+
+_READ_ROWS_RE = re.compile(
+    r"^\s*(?:show|read|get)(?:\s+me)?\s+(?:the\s+)?(?:(?:first\s+|top\s+)?(?P<limit>\d+)\s+)?"
+    r"(?:rows|records)\s+(?:from|of|in)\s+(?:the\s+)?(?P<table>\w+)(?:\s+table)?\s*[?.!]*\s*$",
+    re.IGNORECASE
+)
+_TABLE_STATS_RE = re.compile(
+    r"^\s*(?:(?:show|get)(?:\s+me)?\s+)?(?:the\s+)?(?:stats|statistics)\s+(?:for|on|of)"
+    r"\s+(?:the\s+)?(?P<table>\w+)(?:\s+table)?\s*[?.!]*\s*$",
+    re.IGNORECASE
+)
+
+
+# The model writes tools_to_call before user_facing_message, so the tool
+# list can be picked out of a reply that is still streaming
+_TOOLS_KEY_RE = re.compile(r'"tools_to_call"\s*:\s*')
+_json_decoder = json.JSONDecoder()
+
+
+def _parse_tool_calls(partial_reply: str) -> Optional[List[Dict]]:
+    """Return the tools_to_call array of a partial reply once it is complete."""
+    match = _TOOLS_KEY_RE.search(partial_reply)
+    if not match:
+        return None
+    try:
+        tool_calls, _ = _json_decoder.raw_decode(partial_reply, match.end())
+    except ValueError:
+        return None
+    return tool_calls if isinstance(tool_calls, list) else None
+
+
+# Start of the result call_mcp_tool returns when a call fails outright
+TOOL_ERROR_PREFIX = "Error calling tool"
+
+
+def _msg_to_text(msg: Dict) -> str:
+    """Text of a chat message; structured responses use their display text."""
+    content = msg["content"]
+    if isinstance(content, dict):
+        # Dataframe responses keep the frame in "content" and the text in "message"
+        text = content.get("content")
+        if not isinstance(text, str):
+            text = content.get("message", "")
+        return text
+    return str(content)
+
+
+def _loads(text: str) -> Any:
+    """Parse JSON, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+# Rough size of a token in English text, used when tiktoken is unavailable
+CHARS_PER_TOKEN = 4
+
+
+@st.cache_resource
+def get_token_encoding():
+    """
+    Load the tokenizer used by GPT-4o and later models, once per process.
+    
+    Returns None if tiktoken isn't installed or can't fetch its vocabulary,
+    in which case token counts are estimated from CHARS_PER_TOKEN.
+    """
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        print(f"tiktoken unavailable, estimating token counts: {e}", file=sys.stderr)
+        return None
+
+
+def _count_tokens(text: str) -> int:
+    """Count the tokens in text, or estimate them without tiktoken."""
+    encoding = get_token_encoding()
+    if encoding is None:
+        return -(-len(text) // CHARS_PER_TOKEN)
+    return len(encoding.encode(text))
+
+
+def _trim_tokens(text: str, max_tokens: int) -> str:
+    """Cut text to at most max_tokens tokens."""
+    encoding = get_token_encoding()
+    if encoding is None:
+        return text[:max_tokens * CHARS_PER_TOKEN]
+    tokens = encoding.encode(text)
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max_tokens])
+
+
+def _rows_to_dataframe(data: Dict) -> pd.DataFrame:
+    """
+    Build a DataFrame from a columnar tool result ("columns" plus "rows").
+    
+    Columns are stored as Arrow-backed dtypes where their values allow it:
+    strings take less memory than Python objects, integer columns with
+    NULLs stay integers, and Streamlit can hand the frame to its Arrow
+    renderer on every rerun without converting it again.
+    
+    Each column goes straight into an Arrow array. Columns whose values
+    Arrow can't put in one array (mixed types) fall back to pandas'
+    inference.
+    """
+    rows, columns = data["rows"], data["columns"]
+    if rows:
+        try:
+            table = pa.Table.from_arrays([pa.array(values) for values in zip(*rows)], names=columns)
+            return table.to_pandas(types_mapper=pd.ArrowDtype)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            pass
+    df = pd.DataFrame(rows, columns=columns)
+    return df.convert_dtypes(dtype_backend="pyarrow")
+
+
+def _dataframe_csv(df: pd.DataFrame) -> bytes:
+    """
+    Encode a result DataFrame as CSV for its download button.
+    
+    Arrow's C writer does the encoding. Frames Arrow won't convert or
+    write (duplicate column names, the mixed-type fallback of
+    _rows_to_dataframe, list or struct columns from array_agg or array
+    types) use pandas.
+    """
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        buffer = io.BytesIO()
+        pa_csv.write_csv(table, buffer)
+        return buffer.getvalue()
+    except (ValueError, TypeError, pa.ArrowException):
+        return df.to_csv(index=False).encode("utf-8")
+
+
+def _parse_result(result: str) -> Any:
+    """Parse a tool's JSON result, or return None if it is plain text."""
+    try:
+        return _loads(result)
+    except ValueError:
+        return None
+
+
+def _format_text(message: str, result: str) -> Dict[str, Any]:
+    """Show a tool's text result (describe_table, get_table_stats, search_tables)."""
+    return {
+        "type": "text",
+        "content": f"{message}\n\n{result}"
+    }
+
+
+def _format_list_tables(message: str, result: str) -> Dict[str, Any]:
+    """Summarize a list_tables result as a sentence."""
+    data = _parse_result(result)
+    if not isinstance(data, dict) or "tables" not in data:
+        return _format_text(message, result)
+    
+    if data["tables"]:
+        table_list = ", ".join(data["tables"])
+        formatted_message = f"Your database contains {data['total_count']} tables: {table_list}"
+    else:
+        formatted_message = f"No tables found in schema '{data.get('schema_name', 'public')}'"
+    
+    return {
+        "type": "text",
+        "content": f"{message}\n\n{formatted_message}"
+    }
+
+
+def _format_read_table(message: str, result: str) -> Dict[str, Any]:
+    """Show a read_table page (columnar rows) as a dataframe."""
+    data = _parse_result(result)
+    if not isinstance(data, dict) or not data.get("rows"):
+        return _format_text(message, result)
+    
+    df = _rows_to_dataframe(data)
+    return {
+        "type": "dataframe",
+        "message": message,
+        "content": df,
+        "csv_bytes": _dataframe_csv(df),
+        "metadata": {
+            "table": data.get("table"),
+            "total_rows": data.get("total_rows"),
+            "returned_rows": data.get("returned_rows")
+        }
+    }
+
+
+def _format_query_result(message: str, result: str) -> Dict[str, Any]:
+    """Show execute_query results (columnar rows) as a dataframe."""
+    data = _parse_result(result)
+    if not isinstance(data, dict) or "rows" not in data:
+        # Errors and empty results come back as plain text
+        return _format_text(message, result)
+    
+    if not data["rows"]:
+        return {
+            "type": "text",
+            "content": f"{message}\n\nQuery executed successfully but returned no results."
+        }
+    
+    # A single value (a count, a name) reads better as text than as a table
+    if len(data["rows"]) == 1 and len(data["columns"]) == 1:
+        return {
+            "type": "text",
+            "content": f"{message}\n\n**{data['columns'][0]}**: {data['rows'][0][0]}"
+        }
+    
+    df = _rows_to_dataframe(data)
+    return {
+        "type": "dataframe",
+        "message": message,
+        "content": df,
+        "csv_bytes": _dataframe_csv(df),
+        "metadata": {
+            "query": data.get("query"),
+            "row_count": data.get("row_count"),
+            "columns": data.get("columns")
+        }
+    }
+
+
+# How to present the result of a single tool call; the remaining tools
+# return text, which is shown as is
+_FORMATTERS: Dict[str, Callable[[str, str], Dict[str, Any]]] = {
+    "list_tables": _format_list_tables,
+    "read_table": _format_read_table,
+    "execute_query": _format_query_result,
+}
+
 
 class OpenAIMCPAssistant:
     """Assistant that uses OpenAI GPT-4o to interact with MCP server."""
     
+    # How long a single tool call may wait for the server's reply
+    TOOL_TIMEOUT = timedelta(seconds=60)
+    
+    # Tool calls in flight at once over the shared session
+    MAX_CONCURRENT_TOOLS = 8
+    
+    # Number of GPT interpretations remembered for repeated prompts
+    INTERPRETATION_CACHE_SIZE = 256
+    
+    # History sent with each request: the last HISTORY_MESSAGES chat
+    # messages, each cut to HISTORY_MESSAGE_TOKENS, newest first until
+    # HISTORY_TOKEN_BUDGET is spent
+    HISTORY_MESSAGES = 5
+    HISTORY_MESSAGE_TOKENS = 150
+    HISTORY_TOKEN_BUDGET = 500
+    
+    # Turns in a row whose tool calls all failed before the next request is
+    # answered without planning or calling any tools
+    MAX_FAILED_TURNS = 3
+    
     def __init__(self):
         self.server_path = "postgres_mcp_server.py"
         self.conversation_history = []
         
-    async def call_mcp_tool(self, tool_name: str, arguments: Dict[str, Any]) -> str:
-        """Call an MCP tool and return the result."""
-        server_params = StdioServerParameters(
+        # The server inherits this process's environment (database profile
+        # and credentials); it is captured once and reused for every spawn
+        self._server_params = StdioServerParameters(
             command=sys.executable,
             args=[self.server_path],
             env=os.environ.copy()
         )
         
+        # Interpretations keyed on the exact request sent to the model (model
+        # name and messages, including the recent history), least recently
+        # used first. The assistant is shared by all sessions, whose script
+        # threads may use the cache at the same time
+        self._interpretation_cache: "OrderedDict[str, Dict]" = OrderedDict()
+        self._interpretation_lock = threading.Lock()
+        
+        # One MCP server subprocess and session, reused for every tool call.
+        # The session lives on a persistent background event loop, since
+        # Streamlit reruns the script in a plain thread for each interaction
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
+        self._session: Optional[ClientSession] = None
+        self._session_lock = asyncio.Lock()
+        self._session_closed: Optional[asyncio.Event] = None
+        self._session_task: Optional[asyncio.Task] = None
+        self._tool_slots = asyncio.Semaphore(self.MAX_CONCURRENT_TOOLS)
+    
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        """Start the background event loop that owns the MCP session, once."""
+        with self._loop_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="mcp-client", daemon=True).start()
+                self._loop = loop
+                atexit.register(self.close)
+        return self._loop
+    
+    async def _run_session(self, ready: asyncio.Future, closed: asyncio.Event):
+        """
+        Hold the stdio connection and MCP session open until closed is set.
+        
+        The client context managers must be entered and exited by the same
+        task, so this task owns them for the session's whole lifetime.
+        """
+        session = None
         try:
-            async with stdio_client(server_params) as (read, write):
-                async with ClientSession(read, write) as session:
+            async with stdio_client(self._server_params) as (read, write):
+                async with ClientSession(read, write, read_timeout_seconds=self.TOOL_TIMEOUT) as session:
                     await session.initialize()
-                    result = await session.call_tool(tool_name, arguments)
-                    
-                    if result.content and len(result.content) > 0:
-                        return result.content[0].text
-                    return "No result returned"
+                    self._session = session
+                    ready.set_result(session)
+                    await closed.wait()
         except Exception as e:
-            return f"Error calling tool: {str(e)}"
+            if not ready.done():
+                ready.set_exception(e)
+        finally:
+            if not ready.done():
+                ready.set_exception(RuntimeError("MCP session closed during startup"))
+            if session is not None and self._session is session:
+                self._session = None
+    
+    async def _get_session(self) -> ClientSession:
+        """Return the open MCP session, starting the server on first use."""
+        async with self._session_lock:
+            if self._session is None:
+                ready = asyncio.get_running_loop().create_future()
+                self._session_closed = asyncio.Event()
+                self._session_task = asyncio.create_task(self._run_session(ready, self._session_closed))
+                await ready
+            return self._session
+    
+    def _drop_session(self):
+        """Close the current session so the next call starts a fresh server."""
+        self._session = None
+        if self._session_closed is not None:
+            self._session_closed.set()
+    
+    async def _call_tool(self, tool_name: str, arguments: Dict[str, Any]):
+        """Call a tool over the shared session; runs on the background loop."""
+        session = await self._get_session()
+        try:
+            async with self._tool_slots:
+                return await session.call_tool(tool_name, arguments)
+        except Exception:
+            # The server may have died or stopped answering; don't reuse it
+            if self._session is session:
+                self._drop_session()
+            raise
     
-    def get_ai_interpretation(self, user_message: str, context: List[Dict] = None) -> Dict:
-        """Use GPT-4o to interpret the user's request."""
+    def close(self):
+        """Shut down the MCP session and its server subprocess."""
+        if self._loop is None or self._session_task is None:
+            return
+        
+        async def _close():
+            self._drop_session()
+            await self._session_task
+        
+        try:
+            asyncio.run_coroutine_threadsafe(_close(), self._loop).result(timeout=5)
+        except Exception:
+            pass
+    
+    def run(self, coro):
+        """Run a coroutine on the background loop and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(coro, self._get_loop()).result()
+        
+    async def call_mcp_tool(self, tool_name: str, arguments: Dict[str, Any]) -> str:
+        """Call an MCP tool and return the result; runs on the background loop."""
         try:
-            # Build conversation with context
-            messages = [{"role": "system", "content": SYSTEM_PROMPT}]
+            result = await self._call_tool(tool_name, arguments)
             
-            # Add conversation history for context (last 5 messages)
-            if context:
-                for msg in context[-5:]:
-                    if msg["role"] == "user":
-                        messages.append({"role": "user", "content": msg["content"]})
-                    elif msg["role"] == "assistant" and isinstance(msg["content"], str):
-                        messages.append({"role": "assistant", "content": msg["content"][:500]})  # Truncate long responses
+            if result.content and len(result.content) > 0:
+                return result.content[0].text
+            return "No result returned"
+        except Exception as e:
+            return f"{TOOL_ERROR_PREFIX}: {str(e)}"
+    
+    def _try_local_route(self, user_message: str) -> Optional[Dict]:
+        """
+        Plan requests that need no interpretation, without calling the model.
+        
+        Returns a plan in the same shape as get_ai_interpretation(), or None
+        if the message should go to the model.
+        """
+        if _LIST_TABLES_RE.match(user_message):
+            return {
+                "thoughts": "Routed locally: request to list tables",
+                "tools_to_call": [{"tool": "list_tables", "arguments": {}}],
+                "response_type": "text",
+                "user_facing_message": "Here are the tables in your database:"
+            }
+        
+        match = _DESCRIBE_TABLE_RE.match(user_message)
+        table_name = match and _routed_table(match)
+        if table_name:
+            return {
+                "thoughts": f"Routed locally: request to describe table {table_name}",
+                "tools_to_call": [{"tool": "describe_table", "arguments": {"table_name": table_name}}],
+                "response_type": "text",
+                "user_facing_message": f"Here is the structure of the {table_name} table:"
+            }
+        
+        match = _READ_ROWS_RE.match(user_message)
+        table_name = match and _routed_table(match)
+        if table_name:
+            arguments = {"table_name": table_name}
+            if match.group("limit"):
+                arguments["limit"] = int(match.group("limit"))
+            return {
+                "thoughts": f"Routed locally: request to read rows from table {table_name}",
+                "tools_to_call": [{"tool": "read_table", "arguments": arguments}],
+                "response_type": "dataframe",
+                "user_facing_message": f"Here are the records from the {table_name} table:"
+            }
+        
+        match = _TABLE_STATS_RE.match(user_message)
+        table_name = match and _routed_table(match)
+        if table_name:
+            return {
+                "thoughts": f"Routed locally: request for statistics on table {table_name}",
+                "tools_to_call": [{"tool": "get_table_stats", "arguments": {"table_name": table_name}}],
+                "response_type": "text",
+                "user_facing_message": f"Here are the statistics for the {table_name} table:"
+            }
+        
+        return None
+    
+    def _build_messages(self, user_message: str, context: List[Dict] = None) -> List[Dict]:
+        """
+        Build the chat request: the static system prompt, then one user turn.
+        
+        Recent history and the new request share a single user message, so
+        every request starts with the identical SYSTEM_PROMPT prefix that
+        OpenAI's prompt caching can reuse.
+        """
+        history = []
+        if context:
+            # The chat appends the new message before processing it
+            if context[-1]["role"] == "user" and context[-1]["content"] == user_message:
+                context = context[:-1]
             
-            # Add current message
-            messages.append({"role": "user", "content": user_message})
+            # Walk back from the newest message, skipping repeats of the
+            # message just after it, until the budget is spent
+            budget = self.HISTORY_TOKEN_BUDGET
+            previous = None
+            for msg in reversed(context[-self.HISTORY_MESSAGES:]):
+                # Failed tool turns would only steer the model back to them
+                if isinstance(msg["content"], dict) and msg["content"].get("tool_error"):
+                    continue
+                text = _trim_tokens(_msg_to_text(msg), self.HISTORY_MESSAGE_TOKENS)
+                line = f"{msg['role'].capitalize()}: {text}"
+                if line == previous:
+                    continue
+                budget -= _count_tokens(line)
+                if budget < 0:
+                    break
+                history.append(line)
+                previous = line
+            history.reverse()
+        
+        query = f"[QUERY]\n{user_message}"
+        if history:
+            query = "[HISTORY]\n" + "\n".join(history) + "\n[/HISTORY]\n" + query
+        
+        return [
+            _SYSTEM_MESSAGE,
+            {"role": "user", "content": query}
+        ]
+    
+    def get_ai_interpretation(
+        self,
+        user_message: str,
+        context: List[Dict] = None,
+        on_tools: Optional[Callable[[List[Dict]], None]] = None
+    ) -> Dict:
+        """
+        Use GPT-4o to interpret the user's request.
+        
+        The reply is streamed. If on_tools is given, it is called with the
+        planned tool calls as soon as that part of the reply is complete,
+        while the model is still writing the rest.
+        """
+        try:
+            messages = self._build_messages(user_message, context)
             
-            # Get AI response with dynamic model selection
-            if not openai_client:
+            # Get AI response with dynamic model selection. The assistant
+            # outlives reruns, so it asks the cache for the client rather than
+            # holding the one its first run saw
+            try:
+                client = create_openai_client()
+            except ValueError:
                 return {
                     "thoughts": "OpenAI client not initialized",
                     "tools_to_call": [],
                     "response_type": "text", 
                     "user_facing_message": "AI client is not properly configured. Please check your API credentials."
                 }
+            
+            # The same prompt in the same context gets the same plan, so
+            # answer repeats without another round trip to the model
+            model_name = get_model_name()
+            cache_key = json.dumps([model_name, messages])
+            with self._interpretation_lock:
+                cached_response = self._interpretation_cache.get(cache_key)
+                if cached_response is not None:
+                    self._interpretation_cache.move_to_end(cache_key)
+                    return cached_response
                 
-            response = openai_client.chat.completions.create(
-                model=get_model_name(),
+            stream = client.chat.completions.create(
+                model=model_name,
                 messages=messages,
                 temperature=0.1,  # Low temperature for consistency
-                response_format={"type": "json_object"}
+                response_format={"type": "json_object"},
+                stream=True
             )
             
+            parts = []
+            tools_seen = on_tools is None
+            for chunk in stream:
+                # Some chunks (e.g. Azure's content filter results) carry
+                # no text
+                if not chunk.choices or not chunk.choices[0].delta.content:
+                    continue
+                parts.append(chunk.choices[0].delta.content)
+                if not tools_seen:
+                    tool_calls = _parse_tool_calls("".join(parts))
+                    if tool_calls is not None:
+                        tools_seen = True
+                        on_tools(tool_calls)
+            
             # Parse JSON response
-            ai_response = json.loads(response.choices[0].message.content)
+            ai_response = _loads("".join(parts))
+            
+            with self._interpretation_lock:
+                self._interpretation_cache[cache_key] = ai_response
+                if len(self._interpretation_cache) > self.INTERPRETATION_CACHE_SIZE:
+                    self._interpretation_cache.popitem(last=False)
             return ai_response
             
         except Exception as e:
@@ -198,36 +722,86 @@ class OpenAIMCPAssistant:
                 "user_facing_message": "I encountered an error understanding your request. Please try rephrasing."
             }
     
-    async def process_user_message(self, user_message: str, context: List[Dict] = None) -> Dict[str, Any]:
+    async def _call_tools(self, tool_calls: List[Dict]) -> List[str]:
+        """
+        Run a turn's tool calls concurrently over the shared session.
+        
+        The calls are independent, and call_mcp_tool turns failures into
+        error strings, so one failing tool doesn't cancel the others.
+        """
+        return await asyncio.gather(*[
+            self.call_mcp_tool(tool_call["tool"], tool_call["arguments"])
+            for tool_call in tool_calls
+        ])
+    
+    def _failed_turns(self, context: Optional[List[Dict]]) -> int:
+        """Count this chat's most recent assistant turns whose tools all failed."""
+        failed = 0
+        for msg in reversed(context or []):
+            if msg["role"] != "assistant":
+                continue
+            if not (isinstance(msg["content"], dict) and msg["content"].get("tool_error")):
+                break
+            failed += 1
+        return failed
+    
+    def process_user_message(self, user_message: str, context: List[Dict] = None) -> Dict[str, Any]:
         """Process user message using GPT-4o and execute MCP tools."""
         
-        # Get AI interpretation
-        ai_interpretation = self.get_ai_interpretation(user_message, context)
+        # Stop retrying while the tools keep failing; the next request after
+        # this reply tries them again
+        if self._failed_turns(context) >= self.MAX_FAILED_TURNS:
+            return {
+                "type": "text",
+                "content": "The database tools have failed several times in a row. "
+                           "Please check that the MCP server and database are reachable, then try again."
+            }
+        
+        # Start the planned tools as soon as the streamed plan names them,
+        # so they run while the model finishes its reply
+        early = {}
         
-        # Show AI's thinking (optional - can be hidden in production)
-        with st.expander("🤖 AI Reasoning", expanded=False):
-            st.json(ai_interpretation)
+        def start_tools(tool_calls: List[Dict]):
+            if tool_calls:
+                early["tool_calls"] = tool_calls
+                early["outputs"] = asyncio.run_coroutine_threadsafe(
+                    self._call_tools(tool_calls), self._get_loop()
+                )
+        
+        # Get AI interpretation, unless the request is simple enough to route
+        # without one
+        ai_interpretation = (
+            self._try_local_route(user_message)
+            or self.get_ai_interpretation(user_message, context, on_tools=start_tools)
+        )
         
         # Execute tools based on AI's decision
-        results = []
-        for tool_call in ai_interpretation.get("tools_to_call", []):
-            tool_name = tool_call["tool"]
-            arguments = tool_call["arguments"]
-            
-            # Call the MCP tool
-            result = await self.call_mcp_tool(tool_name, arguments)
-            results.append({
-                "tool": tool_name,
-                "arguments": arguments,
+        tool_calls = ai_interpretation.get("tools_to_call", [])
+        if tool_calls and early.get("tool_calls") == tool_calls:
+            outputs = early["outputs"].result()
+        else:
+            outputs = self.run(self._call_tools(tool_calls)) if tool_calls else []
+        results = [
+            {
+                "tool": tool_call["tool"],
+                "arguments": tool_call["arguments"],
                 "result": result
-            })
+            }
+            for tool_call, result in zip(tool_calls, outputs)
+        ]
         
         # Format response based on results
-        return self.format_response(
+        response = self.format_response(
             ai_interpretation.get("user_facing_message", "Here's what I found:"),
             results,
             ai_interpretation.get("response_type", "text")
         )
+        if outputs and all(output.startswith(TOOL_ERROR_PREFIX) for output in outputs):
+            response["tool_error"] = True
+        
+        # Kept for the "Show AI reasoning" option
+        response["reasoning"] = ai_interpretation
+        return response
     
     def format_response(self, message: str, results: List[Dict], response_type: str) -> Dict[str, Any]:
         """Format the results for display."""
@@ -240,68 +814,8 @@ class OpenAIMCPAssistant:
         # Handle single result
         if len(results) == 1:
             result = results[0]
-            tool_name = result["tool"]
-            
-            # Try to parse as JSON and format based on tool type
-            try:
-                data = json.loads(result["result"])
-                
-                # Handle list_tables response
-                if tool_name == "list_tables" and isinstance(data, dict) and "tables" in data:
-                    if data["tables"]:
-                        table_list = ", ".join(data["tables"])
-                        formatted_message = f"Your database contains {data['total_count']} tables: {table_list}"
-                    else:
-                        formatted_message = f"No tables found in schema '{data.get('schema_name', 'public')}'"
-                    
-                    return {
-                        "type": "text",
-                        "content": f"{message}\n\n{formatted_message}"
-                    }
-                
-                # Handle read_table response (data with rows)
-                elif isinstance(data, dict) and "data" in data and data["data"]:
-                    df = pd.DataFrame(data["data"])
-                    return {
-                        "type": "dataframe",
-                        "message": message,
-                        "content": df,
-                        "metadata": {
-                            "table": data.get("table"),
-                            "total_rows": data.get("total_rows"),
-                            "returned_rows": data.get("returned_rows"),
-                            "query": data.get("query")
-                        }
-                    }
-                
-                # Handle execute_query response (structured query results)
-                elif isinstance(data, dict) and "row_count" in data and "data" in data:
-                    if data["data"]:
-                        df = pd.DataFrame(data["data"])
-                        return {
-                            "type": "dataframe", 
-                            "message": message,
-                            "content": df,
-                            "metadata": {
-                                "query": data.get("query"),
-                                "row_count": data.get("row_count"),
-                                "columns": data.get("columns")
-                            }
-                        }
-                    else:
-                        return {
-                            "type": "text",
-                            "content": f"{message}\n\nQuery executed successfully but returned no results."
-                        }
-                
-            except (json.JSONDecodeError, KeyError):
-                pass
-            
-            # Return raw result as text (for describe_table, get_table_stats, search_tables)
-            return {
-                "type": "text",
-                "content": f"{message}\n\n{result['result']}"
-            }
+            formatter = _FORMATTERS.get(result["tool"], _format_text)
+            return formatter(message, result["result"])
         
         # Handle multiple results
         formatted_content = message + "\n\n"
@@ -310,22 +824,19 @@ class OpenAIMCPAssistant:
         for result in results:
             formatted_content += f"**{result['tool']}**\n"
             
-            # Try to parse as JSON
-            try:
-                data = json.loads(result["result"])
-                if isinstance(data, dict) and "data" in data and data["data"]:
-                    df = pd.DataFrame(data["data"])
-                    dataframes.append({
-                        "df": df,
-                        "metadata": {
-                            "tool": result["tool"],
-                            "table": data.get("table"),
-                            "total_rows": data.get("total_rows")
-                        }
-                    })
-                else:
-                    formatted_content += f"{result['result']}\n\n"
-            except:
+            # Row results become dataframes; everything else is shown as text
+            data = _parse_result(result["result"]) if result["tool"] in _FORMATTERS else None
+            if isinstance(data, dict) and data.get("rows"):
+                df = _rows_to_dataframe(data)
+                dataframes.append({
+                    "df": df,
+                    "metadata": {
+                        "tool": result["tool"],
+                        "table": data.get("table"),
+                        "total_rows": data.get("total_rows")
+                    }
+                })
+            else:
                 formatted_content += f"{result['result']}\n\n"
         
         if dataframes:
@@ -349,8 +860,23 @@ if "messages" not in st.session_state:
         "content": """👋 Hello! I'm your AI-powered database assistant using GPT-4o."""
     })
 
-if "assistant" not in st.session_state:
-    st.session_state.assistant = OpenAIMCPAssistant()
+@st.cache_resource
+def get_assistant() -> OpenAIMCPAssistant:
+    """Return the assistant shared by all sessions, and with it one MCP server."""
+    return OpenAIMCPAssistant()
+
+
+assistant = get_assistant()
+
+# Example queries offered in the sidebar
+EXAMPLES = [
+    "What tables do I have?",
+    "Describe the users table",
+    "Show me 5 rows from products",
+    "How many orders were placed this month?",
+    "Find tables with customer data",
+    "What's the average order value?"
+]
 
 
 # Main UI
@@ -415,21 +941,13 @@ with st.sidebar:
     st.header("🧠 Current Model")
     current_model = get_model_name()
     st.info(f"**{provider_display}**\nModel: `{current_model}`")
+    st.checkbox("Show AI reasoning", value=False, key="show_reasoning")
     
     # Example queries
     st.divider()
     st.header("💡 Example Queries")
-    examples = [
-        "What tables do I have?",
-        "Describe the users table",
-        "Show me 5 rows from products",
-        "How many orders were placed this month?",
-        "Find tables with customer data",
-        "What's the average order value?"
-    ]
-    
-    for example in examples:
-        if st.button(f"→ {example}", key=f"ex_{example}"):
+    for i, example in enumerate(EXAMPLES):
+        if st.button(f"→ {example}", key=f"ex_{i}"):
             st.session_state.example = example
     
     # Clear chat
@@ -438,50 +956,85 @@ with st.sidebar:
         st.rerun()
 
 
+# Rows of a result drawn in the chat; the CSV download keeps them all
+DISPLAY_ROWS = 500
+
+
+# Metrics shown above a result table: metadata key, label and formatter
+METRIC_SPEC = (
+    ("table", "Table", str),
+    ("total_rows", "Total Rows", lambda v: f"{v:,}"),
+    ("returned_rows", "Showing", lambda v: f"{v:,}"),
+    ("row_count", "Rows", lambda v: f"{v:,}"),
+)
+
+
+def _show_metrics(metadata: Dict[str, Any]) -> None:
+    """Show the metrics a result's metadata has, one column each."""
+    present = [
+        (label, fmt(metadata[key]))
+        for key, label, fmt in METRIC_SPEC
+        if metadata.get(key) is not None
+    ]
+    if not present:
+        return
+    for col, (label, value) in zip(st.columns(len(present)), present):
+        col.metric(label, value)
+
+
+def _show_dataframe(df: pd.DataFrame) -> None:
+    """Draw a result table, capped at DISPLAY_ROWS rows."""
+    if len(df) > DISPLAY_ROWS:
+        st.dataframe(df.head(DISPLAY_ROWS), use_container_width=True)
+        st.caption(f"Showing the first {DISPLAY_ROWS:,} of {len(df):,} rows; download the CSV for all of them.")
+    else:
+        st.dataframe(df, use_container_width=True)
+
+
+def _render_response(response: Dict[str, Any], key_suffix) -> None:
+    """Render a structured assistant response from format_response()."""
+    msg_type = response.get("type")
+    
+    if msg_type == "dataframe":
+        st.write(response.get("message", ""))
+        df = response["content"]
+        _show_metrics(response.get("metadata", {}))
+        _show_dataframe(df)
+        
+        # Add download button
+        csv = response.get("csv_bytes") or _dataframe_csv(df)
+        st.download_button(
+            "📥 Download CSV",
+            csv,
+            "query_results.csv",
+            "text/csv",
+            key=f"download_msg_{key_suffix}"
+        )
+        
+    elif msg_type == "mixed":
+        st.write(response["content"])
+        for df_info in response.get("dataframes", []):
+            _show_dataframe(df_info["df"])
+            
+    else:
+        st.write(response.get("content", ""))
+    
+    # Show AI's thinking only on request; the JSON tree is costly to send
+    if st.session_state.get("show_reasoning") and response.get("reasoning"):
+        with st.expander("🤖 AI Reasoning", expanded=False):
+            st.json(response["reasoning"])
+
+
 # Chat interface
 chat_container = st.container()
 
 # Display messages
 with chat_container:
-    for message in st.session_state.messages:
+    for i, message in enumerate(st.session_state.messages):
         with st.chat_message(message["role"]):
             if isinstance(message["content"], dict):
                 # Handle structured responses
-                msg_type = message["content"].get("type")
-                
-                if msg_type == "dataframe":
-                    st.write(message["content"].get("message", ""))
-                    df = message["content"]["content"]
-                    metadata = message["content"].get("metadata", {})
-                    
-                    if metadata:
-                        cols = st.columns(4)
-                        if "table" in metadata:
-                            cols[0].metric("Table", metadata["table"])
-                        if "total_rows" in metadata:
-                            cols[1].metric("Total Rows", f"{metadata['total_rows']:,}")
-                        if "returned_rows" in metadata:
-                            cols[2].metric("Showing", metadata["returned_rows"])
-                    
-                    st.dataframe(df, use_container_width=True)
-                    
-                    # Add download button
-                    csv = df.to_csv(index=False)
-                    st.download_button(
-                        "📥 Download CSV",
-                        csv,
-                        "query_results.csv",
-                        "text/csv",
-                        key=f"download_msg_{st.session_state.messages.index(message)}"
-                    )
-                    
-                elif msg_type == "mixed":
-                    st.write(message["content"]["content"])
-                    for df_info in message["content"].get("dataframes", []):
-                        st.dataframe(df_info["df"], use_container_width=True)
-                        
-                else:
-                    st.write(message["content"].get("content", ""))
+                _render_response(message["content"], i)
             else:
                 st.write(message["content"])
 
@@ -497,39 +1050,13 @@ if "example" in st.session_state:
     with st.chat_message("user"):
         st.write(example_query)
     
+    # The response is rendered with the rest of the chat after the rerun
     with st.chat_message("assistant"):
         with st.spinner("🤔 Thinking..."):
-            response = asyncio.run(
-                st.session_state.assistant.process_user_message(
-                    example_query,
-                    st.session_state.messages
-                )
+            response = assistant.process_user_message(
+                example_query,
+                st.session_state.messages
             )
-            
-            if response["type"] == "dataframe":
-                st.write(response.get("message", ""))
-                df = response["content"]
-                metadata = response.get("metadata", {})
-                
-                if metadata:
-                    cols = st.columns(4)
-                    if "table" in metadata:
-                        cols[0].metric("Table", metadata["table"])
-                    if "total_rows" in metadata:
-                        cols[1].metric("Total Rows", f"{metadata['total_rows']:,}")
-                
-                st.dataframe(df, use_container_width=True)
-                
-                csv = df.to_csv(index=False)
-                st.download_button("📥 Download CSV", csv, "results.csv", "text/csv", key="download_example")
-                
-            elif response["type"] == "mixed":
-                st.write(response["content"])
-                for df_info in response.get("dataframes", []):
-                    st.dataframe(df_info["df"], use_container_width=True)
-            else:
-                st.write(response["content"])
-            
             st.session_state.messages.append({"role": "assistant", "content": response})
     
     st.rerun()
@@ -551,42 +1078,14 @@ if prompt := st.chat_input("Ask anything about your database..."):
         with st.chat_message("user"):
             st.write(prompt)
         
-        # Get AI response
+        # Get AI response; it is rendered with the rest of the chat after
+        # the rerun
         with st.chat_message("assistant"):
             with st.spinner("🤔 Thinking..."):
-                response = asyncio.run(
-                    st.session_state.assistant.process_user_message(
-                        prompt,
-                        st.session_state.messages
-                    )
+                response = assistant.process_user_message(
+                    prompt,
+                    st.session_state.messages
                 )
-                
-                if response["type"] == "dataframe":
-                    st.write(response.get("message", ""))
-                    df = response["content"]
-                    metadata = response.get("metadata", {})
-                    
-                    if metadata:
-                        cols = st.columns(4)
-                        if "table" in metadata:
-                            cols[0].metric("Table", metadata["table"])
-                        if "total_rows" in metadata:
-                            cols[1].metric("Total Rows", f"{metadata['total_rows']:,}")
-                        if "returned_rows" in metadata:
-                            cols[3].metric("Showing", metadata["returned_rows"])
-                    
-                    st.dataframe(df, use_container_width=True)
-                    
-                    csv = df.to_csv(index=False)
-                    st.download_button("📥 Download CSV", csv, "results.csv", "text/csv", key="download_prompt")
-                    
-                elif response["type"] == "mixed":
-                    st.write(response["content"])
-                    for df_info in response.get("dataframes", []):
-                        st.dataframe(df_info["df"], use_container_width=True)
-                else:
-                    st.write(response["content"])
-                
                 st.session_state.messages.append({"role": "assistant", "content": response})
         
         st.rerun()
\ No newline at end of file
@@ -757,9 +757,9 @@ class OpenAIMCPAssistant:
                         "content": f"{message}\n\n{formatted_message}"
                     }
                 
-                # Handle read_table response (data with rows)
-                elif isinstance(data, dict) and "data" in data and data["data"]:
-                    df = pd.DataFrame(data["data"])
+                # Handle read_table response (columnar rows)
+                elif isinstance(data, dict) and "rows" in data and data["rows"]:
+                    df = pd.DataFrame(data["rows"], columns=data["columns"])
                     returned_rows = data.get("returned_rows")
                     if returned_rows is None:
                         returned_rows = len(df)  # fallback
@@ -777,8 +777,8 @@ class OpenAIMCPAssistant:
                     }
                 
                 # Handle execute_query response (structured query results)
-                elif isinstance(data, dict) and "row_count" in data and "data" in data:
-                    df = pd.DataFrame(data["data"]) if data["data"] else pd.DataFrame()
+                elif isinstance(data, dict) and "row_count" in data and "rows" in data:
+                    df = pd.DataFrame(data["rows"], columns=data["columns"]) if data["rows"] else pd.DataFrame()
                     return {
                         "type": "dataframe", 
                         "message": message if not df.empty else f"{message}\n\nQuery executed successfully but returned no results.",
@@ -810,8 +810,8 @@ class OpenAIMCPAssistant:
             # Try to parse as JSON
             try:
                 data = json.loads(result["result"])
-                if isinstance(data, dict) and "data" in data and data["data"]:
-                    df = pd.DataFrame(data["data"])
+                if isinstance(data, dict) and "rows" in data and data["rows"]:
+                    df = pd.DataFrame(data["rows"], columns=data["columns"])
                     dataframes.append({
                         "df": df,
                         "metadata": {
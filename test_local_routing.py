@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test Local Request Routing
+Verify which chat requests the Streamlit client plans itself, without GPT,
+and that references to earlier turns ("it", "that table") go to the model.
+"""
+
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+
+from streamlit_openai_mcp import OpenAIMCPAssistant
+
+
+def route(message):
+    """Return the locally planned tool calls for message, or None."""
+    plan = OpenAIMCPAssistant()._try_local_route(message)
+    return plan and plan["tools_to_call"]
+
+
+def test_list_tables():
+    """Plain requests for the table list are routed locally."""
+    for message in ["What tables do I have?", "list tables", "Show me all the tables in my database"]:
+        assert route(message) == [{"tool": "list_tables", "arguments": {}}], message
+    
+    assert route("which tables have customer data?") is None
+
+
+def test_describe_table():
+    """Describe requests naming a table are routed; references are not."""
+    assert route("Describe the users table") == [
+        {"tool": "describe_table", "arguments": {"table_name": "users"}}
+    ]
+    assert route("structure of Servers") == [
+        {"tool": "describe_table", "arguments": {"table_name": "Servers"}}
+    ]
+    
+    for message in ["describe that table", "describe it", "Describe the table",
+                    "describe this", "describe servers and applications"]:
+        assert route(message) is None, message
+
+
+def test_read_rows():
+    """Row reads naming a table are routed, with the row count as the limit."""
+    assert route("Show me 5 rows from products") == [
+        {"tool": "read_table", "arguments": {"table_name": "products", "limit": 5}}
+    ]
+    assert route("show rows from servers") == [
+        {"tool": "read_table", "arguments": {"table_name": "servers"}}
+    ]
+    
+    for message in ["show me 10 rows from it", "show rows from that table",
+                    "show me 5 rows from products where price > 3"]:
+        assert route(message) is None, message
+
+
+def test_table_stats():
+    """Statistics requests naming a table are routed; references are not."""
+    assert route("stats for servers") == [
+        {"tool": "get_table_stats", "arguments": {"table_name": "servers"}}
+    ]
+    
+    for message in ["stats for this table", "statistics of them", "statistics on servers and apps"]:
+        assert route(message) is None, message
+
+
+def main():
+    """Run all routing tests."""
+    print("🔄 Testing local request routing...")
+    tests = [test_list_tables, test_describe_table, test_read_rows, test_table_stats]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print(f"\n🎉 All {len(tests)} routing tests passed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Test Query Capping
+Verify that execute_query drops a statement's closing semicolon, and any
+comments after it, before wrapping the query in its outer LIMIT.
+"""
+
+from postgres_mcp_server import _TRAILING_SEMICOLON_RE
+
+
+def strip(query):
+    """Return the query body execute_query puts inside the LIMIT wrapper."""
+    return _TRAILING_SEMICOLON_RE.sub('', query.rstrip())
+
+
+def test_plain_semicolon():
+    """A bare closing semicolon is dropped; queries without one are kept."""
+    assert strip("SELECT 1;") == "SELECT 1"
+    assert strip("SELECT 1 ;  \n") == "SELECT 1 "
+    assert strip("SELECT 1") == "SELECT 1"
+
+
+def test_line_comment():
+    """A semicolon followed by -- comments is dropped along with them."""
+    assert strip("SELECT count(*) FROM servers; -- total") == "SELECT count(*) FROM servers"
+    assert strip("SELECT 1; -- one\n-- two\n") == "SELECT 1"
+
+    # Without a semicolon the comment stays; the wrapper's newline ends it
+    assert strip("SELECT 1 -- note") == "SELECT 1 -- note"
+
+
+def test_block_comment():
+    """A semicolon followed by /* */ comments is dropped along with them."""
+    assert strip("SELECT 1; /* note */") == "SELECT 1"
+    assert strip("SELECT 1;/* spans\nlines */\n") == "SELECT 1"
+    assert strip("SELECT 1; /* a */ -- b\n/* c */") == "SELECT 1"
+
+
+def test_inner_semicolon():
+    """Semicolons that are not at the end of the statement are kept."""
+    assert strip("SELECT ';' AS sep") == "SELECT ';' AS sep"
+    assert strip("SELECT 1; SELECT 2") == "SELECT 1; SELECT 2"
+
+
+def main():
+    """Run all query capping tests."""
+    print("🔄 Testing query capping...")
+    tests = [test_plain_semicolon, test_line_comment, test_block_comment, test_inner_semicolon]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print(f"\n🎉 All {len(tests)} query capping tests passed!")
+
+
+if __name__ == "__main__":
+    main()
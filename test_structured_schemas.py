@@ -58,7 +58,7 @@ async def test_structured_tools():
                     print(f"   Table: {data.get('table', 'unknown')}")
                     print(f"   Total rows: {data.get('total_rows', 0)}")
                     print(f"   Returned rows: {data.get('returned_rows', 0)}")
-                    print(f"   Data columns: {len(data.get('data', [{}])[0].keys()) if data.get('data') else 0} columns")
+                    print(f"   Data columns: {len(data.get('columns', []))} columns")
                     
                 except Exception as e:
                     print(f"❌ read_table failed: {e}")